@@ -0,0 +1,25 @@
+"""Lengths of the sound assets, read from their WAV headers.
+
+Nothing is decoded and Pydub is not imported, so the physics-only paths can
+size the end screen exactly like the rendered clips do.
+"""
+
+import wave
+from pathlib import Path
+
+from .. import config
+
+
+def sound_duration(name: str) -> float | None:
+    """Return the length in seconds of the sound asset ``name``, ``None`` if it is missing."""
+    path = Path(config.ASSET_PATHS["sounds"]) / f"{name}.wav"
+    try:
+        with wave.open(str(path), "rb") as wav:
+            return wav.getnframes() / wav.getframerate()
+    except (OSError, EOFError, wave.Error):
+        return None
+
+
+def fail_sound_duration() -> float | None:
+    """Return the length of the crowd sound played when a run is lost."""
+    return sound_duration("fail_crowd")
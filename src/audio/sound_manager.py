@@ -2,33 +2,158 @@
 
 from pathlib import Path
 from typing import Dict, List, Tuple
+import hashlib
+import json
+import os
 import random
 
+import numpy as np
 from pydub import AudioSegment
 
 from .. import config
 
 
-def load_sounds() -> Dict[str, AudioSegment]:
-    """Load all WAV files from the assets directory."""
-    sounds = {}
-    for wav in Path(config.ASSET_PATHS["sounds"]).glob("*.wav"):
-        sounds[wav.stem] = AudioSegment.from_wav(wav)
-    return sounds
+def decode(segment: AudioSegment) -> np.ndarray:
+    """Return ``segment`` as ``(samples, channels)`` int16 PCM in the common format.
 
+    The sample rate and channel count come from ``config.AUDIO_SAMPLE_RATE``
+    and ``config.AUDIO_CHANNELS``.
+    """
+    segment = (
+        segment.set_frame_rate(config.AUDIO_SAMPLE_RATE)
+        .set_channels(config.AUDIO_CHANNELS)
+        .set_sample_width(2)
+    )
+    pcm = np.frombuffer(segment.raw_data, dtype=np.int16)
+    return pcm.reshape(-1, config.AUDIO_CHANNELS)
 
-def mix_tracks(duration: int, events: List[Tuple[float, str]], sounds: Dict[str, AudioSegment]) -> AudioSegment:
-    """Create a mixed soundtrack using the provided events."""
+
+def to_segment(pcm: np.ndarray) -> AudioSegment:
+    """Wrap int16 PCM in the common format as a Pydub ``AudioSegment``."""
+    return AudioSegment(
+        data=np.ascontiguousarray(pcm, dtype=np.int16).tobytes(),
+        sample_width=2,
+        frame_rate=config.AUDIO_SAMPLE_RATE,
+        channels=config.AUDIO_CHANNELS,
+    )
+
+
+def _sound_files() -> List[Path]:
+    return list(Path(config.ASSET_PATHS["sounds"]).glob("*.wav"))
+
+
+def _decode_all(files: List[Path]) -> Dict[str, np.ndarray]:
+    return {wav.stem: decode(AudioSegment.from_wav(wav)) for wav in files}
+
+
+def _bank_key(files: List[Path]) -> str:
+    """Return a hash of the common format and of the name, size and date of ``files``."""
+    digest = hashlib.sha256()
+    digest.update(f"{config.AUDIO_SAMPLE_RATE} {config.AUDIO_CHANNELS}\n".encode())
+    for wav in files:
+        stat = wav.stat()
+        digest.update(f"{wav.name} {stat.st_size} {stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _index_path() -> str:
+    return os.path.splitext(config.SOUND_BANK_PATH)[0] + ".json"
+
+
+def _load_bank_index(key: str) -> dict | None:
+    """Return the index of the sound bank, or ``None`` if it is missing or stale."""
+    try:
+        with open(_index_path(), encoding="utf-8") as fh:
+            index = json.load(fh)
+        size = os.path.getsize(config.SOUND_BANK_PATH)
+    except (OSError, ValueError):
+        return None
+    if index.get("key") != key or size != index.get("samples", -1) * 2:
+        return None
+    return index
+
+
+def build_sound_bank(files: List[Path] | None = None) -> dict:
+    """Decode the sound assets into ``config.SOUND_BANK_PATH`` and return its index.
+
+    Sounds are stored one after another as int16 PCM in the common format.
+    The index, written next to it, maps each name to its first value and
+    number of values in the pack, in the order the files were found.
+    """
+    files = _sound_files() if files is None else files
+    sounds = _decode_all(files)
+    index = {"key": _bank_key(files), "samples": 0, "sounds": {}}
+    os.makedirs(os.path.dirname(config.SOUND_BANK_PATH), exist_ok=True)
+    tmp = f"{config.SOUND_BANK_PATH}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        for name, pcm in sounds.items():
+            index["sounds"][name] = [index["samples"], pcm.size]
+            index["samples"] += pcm.size
+            fh.write(pcm.tobytes())
+    os.replace(tmp, config.SOUND_BANK_PATH)
+    tmp = f"{_index_path()}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(index, fh, indent=2)
+    os.replace(tmp, _index_path())
+    return index
+
+
+def load_sounds() -> Dict[str, np.ndarray]:
+    """Load all WAV files from the assets directory, decoded with :func:`decode`.
+
+    When ``config.OUTPUT_CACHE_ENABLED`` is set the sounds are read-only
+    views of the sound bank, mapped in memory and built first if needed, so
+    every process shares the same pages. Otherwise they are decoded here.
+    """
+    files = _sound_files()
+    if not config.OUTPUT_CACHE_ENABLED:
+        return _decode_all(files)
+    key = _bank_key(files)
+    index = _load_bank_index(key) or build_sound_bank(files)
+    if not index["samples"]:
+        return {}
+    pack = np.memmap(config.SOUND_BANK_PATH, dtype=np.int16, mode="r")
+    return {
+        name: pack[start : start + size].reshape(-1, config.AUDIO_CHANNELS)
+        for name, (start, size) in index["sounds"].items()
+    }
+
+
+def _sample(ms: float) -> int:
+    """Return the index of the sample played ``ms`` milliseconds in."""
+    return int(ms * config.AUDIO_SAMPLE_RATE / 1000)
+
+
+def mix_tracks(
+    duration: float,
+    events: List[Tuple[float, str]],
+    sounds: Dict[str, np.ndarray],
+    rng: random.Random | None = None,
+) -> AudioSegment:
+    """Create a mixed soundtrack using the provided events.
+
+    ``sounds`` maps names to PCM arrays from :func:`load_sounds`. Every sound
+    is added into one int32 buffer of ``duration`` seconds, sounds running
+    past the end are cut, and the sum is clipped to int16 once.
+
+    ``rng`` picks the impact sound variants; pass a seeded generator to get
+    the same soundtrack for the same events.
+    """
+    rng = rng or random
     victory_ts = next((ts for ts, name in events if name == "victory"), None)
 
-    track = AudioSegment.silent(duration=duration * 1000)
+    track = np.zeros((_sample(duration * 1000), config.AUDIO_CHANNELS), dtype=np.int32)
+
+    def add(pcm: np.ndarray, start: int) -> None:
+        end = min(start + len(pcm), len(track))
+        if end > start:
+            track[start:end] += pcm[: end - start]
 
-    base = sounds.get("bpm_loop", AudioSegment.silent(duration=duration * 1000))
-    if config.SOUND_ENABLED.get("bpm_loop", True):
-        loops = int((duration * 1000) / len(base)) + 1
-        backing = base * loops
-        end = duration * 1000 if victory_ts is None else int(victory_ts * 1000)
-        track = track.overlay(backing[:end], position=0)
+    base = sounds.get("bpm_loop")
+    if base is not None and len(base) and config.SOUND_ENABLED.get("bpm_loop", True):
+        end = len(track) if victory_ts is None else min(len(track), _sample(int(victory_ts * 1000)))
+        for start in range(0, end, len(base)):
+            track[start : min(start + len(base), end)] += base[: end - start]
 
     impact_variants = [n for n in sounds if n.startswith("impact")]
     prev_impact: str | None = None
@@ -38,7 +163,7 @@ def mix_tracks(duration: int, events: List[Tuple[float, str]], sounds: Dict[str,
             options = impact_variants.copy()
             if prev_impact in options and len(options) > 1:
                 options.remove(prev_impact)
-            choice = random.choice(options)
+            choice = rng.choice(options)
             prev_impact = choice
             to_play.append(choice)
         elif name == "victory":
@@ -50,6 +175,6 @@ def mix_tracks(duration: int, events: List[Tuple[float, str]], sounds: Dict[str,
 
         for sound_name in to_play:
             if sound_name in sounds and config.SOUND_ENABLED.get(sound_name, True):
-                segment = sounds[sound_name]
-                track = track.overlay(segment, position=int(ts * 1000))
-    return track
+                add(sounds[sound_name], _sample(int(ts * 1000)))
+    np.clip(track, -32768, 32767, out=track)
+    return to_segment(track.astype(np.int16))
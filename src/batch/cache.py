@@ -0,0 +1,121 @@
+"""Content-addressed cache of generated clips.
+
+A clip is fully determined by its seed, its CLI options, the effective
+configuration and the asset files, so the hash of all of these identifies the
+MP4 it produces. The cache directory is the index: the clip of key ``k`` is
+stored as ``<OUTPUT_CACHE_DIR>/k.mp4``. Runs without a seed are never cached
+since they cannot be reproduced.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import os
+import shutil
+from typing import Optional
+
+from .. import config
+
+# Bumped whenever the code drawing clips or intro frames changes their pixels
+CACHE_VERSION = 8
+
+# Configuration values that change how a clip is produced but not its content
+_IGNORED_CONFIG = {
+    "OUTPUT_DIR",
+    "OUTPUT_CACHE_DIR",
+    "OUTPUT_CACHE_ENABLED",
+    "INTRO_CACHE_DIR",
+    "FONT_CACHE_PATH",
+    "SOUND_BANK_PATH",
+    "STREAM_QUEUE_SIZE",
+    "ENCODER_THREADS",
+    "BLOCK_DEBUG_LOGS",
+    "FRAME_RING_SLOTS",
+    "RENDER_RING_SLOTS",
+    "ROTATION_CACHE_MAX_BYTES",
+}
+
+
+def config_fingerprint() -> str:
+    """Return a hash of the configuration values that affect a clip."""
+    digest = hashlib.sha256()
+    for name in sorted(vars(config)):
+        if not name.isupper() or name in _IGNORED_CONFIG:
+            continue
+        digest.update(f"{name}={getattr(config, name)!r}\n".encode())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _assets_fingerprint(asset_dirs: tuple[str, ...]) -> str:
+    digest = hashlib.sha256()
+    for directory in asset_dirs:
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, directory).encode())
+                with open(path, "rb") as fh:
+                    for chunk in iter(lambda: fh.read(1 << 20), b""):
+                        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def assets_fingerprint() -> str:
+    """Return a hash of every asset file, computed once per process."""
+    return _assets_fingerprint(tuple(sorted(config.ASSET_PATHS.values())))
+
+
+def clip_key(
+    seed: Optional[int],
+    sky: str | None,
+    perfect_stack: bool | None,
+    with_audio: bool,
+) -> str | None:
+    """Return the cache key of a clip, or ``None`` if it cannot be cached."""
+    if seed is None:
+        return None
+    if perfect_stack is None:
+        perfect_stack = config.PERFECT_STACK
+    digest = hashlib.sha256()
+    for part in (
+        CACHE_VERSION,
+        seed,
+        sky,
+        bool(perfect_stack),
+        bool(with_audio),
+        config_fingerprint(),
+        assets_fingerprint(),
+    ):
+        digest.update(f"{part!r}\n".encode())
+    return digest.hexdigest()
+
+
+def cached_path(key: str) -> str:
+    """Return where the clip of ``key`` is stored in the cache."""
+    return os.path.join(config.OUTPUT_CACHE_DIR, f"{key}.mp4")
+
+
+def restore(key: str | None, output: str) -> bool:
+    """Copy the cached clip of ``key`` to ``output`` and return whether it existed."""
+    if key is None or not config.OUTPUT_CACHE_ENABLED:
+        return False
+    path = cached_path(key)
+    if not os.path.exists(path):
+        return False
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    shutil.copyfile(path, output)
+    return True
+
+
+def store(key: str | None, output: str) -> None:
+    """Add the freshly generated ``output`` to the cache under ``key``."""
+    if key is None or not config.OUTPUT_CACHE_ENABLED:
+        return
+    os.makedirs(config.OUTPUT_CACHE_DIR, exist_ok=True)
+    # Copy under a temporary name first so concurrent workers never see a
+    # partial file under the final key.
+    tmp = f"{cached_path(key)}.{os.getpid()}.tmp"
+    shutil.copyfile(output, tmp)
+    os.replace(tmp, cached_path(key))
@@ -0,0 +1,323 @@
+"""Calibrate the difficulty of the challenge from batches of headless runs.
+
+Each parameter set is evaluated on the same seeds with
+:func:`~.simulate.simulate_outcome`, which gives its win rate and the
+distribution of the time taken to win. Using the same seeds everywhere keeps
+the comparison between parameter sets fair with few runs. Parameter sets are
+either a grid, or the successive midpoints of a bisection on one parameter
+whose effect on the win rate is monotonic. The chosen values are written as
+assignments to paste into ``src/config.py``.
+
+Runs are independent, so chunks of seeds are spread over a process pool in
+which each task applies its parameters to ``config`` before simulating.
+"""
+
+import argparse
+import itertools
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .. import config
+from .simulate import simulate_outcome
+
+# Parameters the calibration is meant for, with the type of their values;
+# others can be given too and keep the type of their value in ``config``
+TUNABLE = {
+    "CRANE_OSC_AMPLITUDE_RANGE": float,
+    "CRANE_OSC_FREQUENCY_RANGE": float,
+    "CRANE_OSC_SPEED_SCALE": float,
+    # Offsets drawn with ``randint`` and whole seconds of the timer
+    "DROP_VARIATION_RANGE": int,
+    "BLOCK_DROP_INTERVAL": float,
+    "TIME_LIMIT": int,
+}
+
+
+@dataclass(frozen=True)
+class Estimate:
+    """Results of the runs of one parameter set.
+
+    ``win_times`` holds, for every victory, the seconds of challenge played
+    before the tower reached the target height.
+    """
+
+    params: dict
+    runs: int
+    win_times: np.ndarray
+
+    @property
+    def win_rate(self) -> float:
+        return len(self.win_times) / self.runs if self.runs else 0.0
+
+    def win_time_quantiles(self, quantiles=(0.1, 0.5, 0.9)) -> list[float]:
+        """Return the given quantiles of the time to win, NaN without victory."""
+        if not len(self.win_times):
+            return [float("nan")] * len(quantiles)
+        return [float(q) for q in np.quantile(self.win_times, quantiles)]
+
+    def summary(self) -> str:
+        p10, p50, p90 = self.win_time_quantiles()
+        params = " ".join(f"{name}={value!r}" for name, value in self.params.items())
+        return (
+            f"{params}: win rate {self.win_rate:.1%} over {self.runs} runs, "
+            f"time to win p10/p50/p90 {p10:.2f}/{p50:.2f}/{p90:.2f} s"
+        )
+
+
+@contextmanager
+def overridden(params: dict):
+    """Temporarily set the ``config`` values of ``params``."""
+    previous = {name: getattr(config, name) for name in params}
+    for name, value in params.items():
+        setattr(config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(config, name, value)
+
+
+def checked_value(name: str, value):
+    """Return ``value`` checked against the setting ``config.<name>``.
+
+    Values have the type given by ``TUNABLE``, or else the type of the
+    current value. Integers are accepted for float settings. A float for an
+    integer setting, a single value for a range or the other way around,
+    or an unknown name raise a ``ValueError`` before any run starts.
+    """
+    if not hasattr(config, name):
+        raise ValueError(f"Unknown config value '{name}'")
+    current = getattr(config, name)
+    if isinstance(current, tuple):
+        if not isinstance(value, tuple) or len(value) != len(current):
+            raise ValueError(f"{name} is a range of {len(current)} values, got {value!r}")
+        return tuple(_scalar(name, item, part) for item, part in zip(current, value))
+    return _scalar(name, current, value)
+
+
+def check_scalar(name: str) -> None:
+    """Raise a ``ValueError`` unless ``config.<name>`` is a single number."""
+    if isinstance(checked_value(name, getattr(config, name, None)), tuple):
+        raise ValueError(f"{name} is a range, only single values can be bisected")
+
+
+def _scalar(name: str, current, value):
+    if isinstance(current, bool) or not isinstance(current, (int, float)):
+        raise ValueError(f"{name} is not a numeric setting")
+    if isinstance(value, tuple):
+        raise ValueError(f"{name} takes a single value, got {value!r}")
+    kind = TUNABLE.get(name, type(current))
+    if kind is int and not isinstance(value, int):
+        raise ValueError(f"{name} is an integer, got {value!r}")
+    return value
+
+
+def _run_chunk(task) -> tuple[int, int, list[float]]:
+    """Run the seeds of ``task`` and return its key, run count and win times."""
+    key, params, seeds, perfect_stack = task
+    win_times = []
+    with overridden(params):
+        for seed in seeds:
+            outcome = simulate_outcome(seed, perfect_stack=perfect_stack)
+            if outcome.state == "victory":
+                win_times.append(config.TIME_LIMIT - outcome.final_remaining)
+    return key, len(seeds), win_times
+
+
+def evaluate(
+    param_sets: list[dict],
+    seeds: range,
+    workers: int | None = None,
+    chunk_size: int = 16,
+    perfect_stack: bool = False,
+) -> list[Estimate]:
+    """Return an :class:`Estimate` for every parameter set, all run on ``seeds``.
+
+    Without ``workers`` the runs happen in this process. Parameters are
+    checked with :func:`checked_value` first.
+    """
+    param_sets = [
+        {name: checked_value(name, value) for name, value in params.items()}
+        for params in param_sets
+    ]
+    tasks = [
+        (key, params, seeds[first:first + chunk_size], perfect_stack)
+        for key, params in enumerate(param_sets)
+        for first in range(0, len(seeds), chunk_size)
+    ]
+    runs = [0] * len(param_sets)
+    win_times: list[list[float]] = [[] for _ in param_sets]
+    if workers:
+        import multiprocessing
+
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(workers) as pool:
+            results = list(pool.imap_unordered(_run_chunk, tasks))
+    else:
+        results = [_run_chunk(task) for task in tasks]
+    for key, count, times in results:
+        runs[key] += count
+        win_times[key].extend(times)
+    return [
+        Estimate(params, runs[key], np.sort(np.asarray(win_times[key], dtype=float)))
+        for key, params in enumerate(param_sets)
+    ]
+
+
+def grid(values: dict[str, list]) -> list[dict]:
+    """Return every combination of the candidate ``values`` of each parameter."""
+    names = list(values)
+    return [dict(zip(names, combo)) for combo in itertools.product(*values.values())]
+
+
+def closest(estimates: Iterable[Estimate], target: float) -> Estimate:
+    """Return the estimate whose win rate is the closest to ``target``."""
+    return min(estimates, key=lambda estimate: abs(estimate.win_rate - target))
+
+
+def bisect(
+    name: str,
+    low: float,
+    high: float,
+    target: float,
+    seeds: range,
+    steps: int = 6,
+    integer: bool = False,
+    workers: int | None = None,
+    perfect_stack: bool = False,
+) -> list[Estimate]:
+    """Search the value of ``name`` between ``low`` and ``high`` giving a ``target`` win rate.
+
+    The win rate is assumed to move monotonically with the parameter, in
+    either direction. Both bounds are evaluated first, then ``steps``
+    midpoints; every estimate is returned, in evaluation order. ``name``
+    must be a scalar setting, and an integer one needs ``integer``.
+    """
+    check_scalar(name)
+
+    def value(x: float):
+        return int(round(x)) if integer else x
+
+    estimates = evaluate(
+        [{name: value(low)}, {name: value(high)}], seeds, workers, perfect_stack=perfect_stack
+    )
+    low_rate, high_rate = estimates[0].win_rate, estimates[1].win_rate
+    increasing = high_rate >= low_rate
+    for _ in range(steps):
+        middle = (low + high) / 2
+        if integer and value(middle) in (value(low), value(high)):
+            break
+        (estimate,) = evaluate([{name: value(middle)}], seeds, workers, perfect_stack=perfect_stack)
+        estimates.append(estimate)
+        if (estimate.win_rate < target) == increasing:
+            low = middle
+        else:
+            high = middle
+    return estimates
+
+
+def parse_value(text: str):
+    """Parse ``"2"``, ``"1.5"`` or a range such as ``"0.4:0.8"`` into numbers."""
+    if ":" in text:
+        return tuple(parse_value(part) for part in text.split(":"))
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def overlay(estimate: Estimate, target: float) -> str:
+    """Return ``config`` assignments for the parameters of ``estimate``."""
+    p10, p50, p90 = estimate.win_time_quantiles()
+    lines = [
+        f"# Calibration : taux de victoire visé {target:.0%}, obtenu "
+        f"{estimate.win_rate:.1%} sur {estimate.runs} parties",
+        f"# (temps pour gagner p10/p50/p90 : {p10:.2f}/{p50:.2f}/{p90:.2f} s)",
+    ]
+    lines += [f"{name} = {value!r}" for name, value in estimate.params.items()]
+    return "\n".join(lines) + "\n"
+
+
+def _parse_grid(items: list[str]) -> dict[str, list]:
+    values = {}
+    for item in items:
+        name, _, candidates = item.partition("=")
+        values[name] = [checked_value(name, parse_value(text)) for text in candidates.split(",")]
+    return values
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Estimate win rates over parameter sets and pick one hitting a target"
+    )
+    parser.add_argument("--target", type=float, required=True, help="Win rate to reach, e.g. 0.4")
+    parser.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        metavar="NAME=V1,V2",
+        help=f"Candidate values of a config parameter; ranges as LOW:HIGH. Meant for {', '.join(TUNABLE)}",
+    )
+    parser.add_argument("--bisect", metavar="NAME", help="Bisect a single scalar parameter instead")
+    parser.add_argument("--low", type=float, help="Lower bound of the bisected parameter")
+    parser.add_argument("--high", type=float, help="Upper bound of the bisected parameter")
+    parser.add_argument("--steps", type=int, default=6, help="Bisection steps")
+    parser.add_argument("--seed", type=int, default=0, help="First seed of the runs")
+    parser.add_argument("--runs", type=int, default=500, help="Runs per parameter set")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Run simulations in a pool of N worker processes",
+    )
+    parser.add_argument(
+        "--perfect-stack",
+        action="store_true",
+        help="Empile automatiquement les blocs sans mouvement de grue",
+    )
+    parser.add_argument("--output", default=None, help="File to write the config overlay to")
+    args = parser.parse_args()
+
+    seeds = range(args.seed, args.seed + args.runs)
+    try:
+        if args.bisect:
+            check_scalar(args.bisect)
+        grid_values = _parse_grid(args.grid)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.bisect:
+        if args.low is None or args.high is None:
+            parser.error("--bisect needs --low and --high")
+        integer = TUNABLE.get(args.bisect, type(getattr(config, args.bisect))) is int
+        results = bisect(
+            args.bisect,
+            args.low,
+            args.high,
+            args.target,
+            seeds,
+            steps=args.steps,
+            integer=integer,
+            workers=args.workers,
+            perfect_stack=args.perfect_stack,
+        )
+    elif args.grid:
+        results = evaluate(
+            grid(grid_values),
+            seeds,
+            workers=args.workers,
+            perfect_stack=args.perfect_stack,
+        )
+    else:
+        parser.error("give --grid values or a --bisect parameter")
+    for estimate in results:
+        print(estimate.summary(), file=sys.stderr)
+    text = overlay(closest(results, args.target), args.target)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text)
+    else:
+        sys.stdout.write(text)
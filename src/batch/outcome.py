@@ -0,0 +1,107 @@
+"""Outcome of runs computed from the physics alone, to pick seeds quickly.
+
+Nothing here imports pygame, MoviePy or Pydub: a run is simulated without
+recording frames and only its :class:`~.trace.Outcome` is kept.
+"""
+
+import argparse
+import json
+import sys
+from typing import Iterable, Iterator, Optional
+
+from .. import config
+from .simulate import simulate_outcome
+from .trace import Outcome
+
+
+def outcomes(
+    seeds: Iterable[int],
+    perfect_stack: bool | None = None,
+    sky: str | None = None,
+    fail_sound_duration: float | None = None,
+) -> Iterator[Outcome]:
+    """Yield the outcome of the run of every seed of ``seeds``, in order.
+
+    The arguments are those of :func:`~.simulate.simulate_outcome`.
+    """
+    for seed in seeds:
+        yield simulate_outcome(seed, perfect_stack, sky, fail_sound_duration)
+
+
+def write_outcomes(results: Iterable[Outcome], output: Optional[str] = None) -> int:
+    """Write ``results`` as JSON lines as they come and return how many there were.
+
+    Lines go to ``output``, or to the standard output when it is omitted, and
+    are flushed one by one so that a long run can be followed.
+    """
+    out = open(output, "w", encoding="utf-8") if output else sys.stdout
+    written = 0
+    try:
+        for result in results:
+            out.write(json.dumps(result.to_dict()) + "\n")
+            out.flush()
+            written += 1
+    finally:
+        if output:
+            out.close()
+    return written
+
+
+def main(
+    seed: int,
+    count: int,
+    perfect_stack: bool | None = None,
+    sky: str | None = None,
+    fail_sound_duration: float | None = None,
+    output: Optional[str] = None,
+) -> None:
+    """Write the outcomes of seeds ``seed`` to ``seed + count - 1`` as JSON lines.
+
+    Lines go to ``output``, or to the standard output when it is omitted.
+    """
+    write_outcomes(
+        outcomes(range(seed, seed + count), perfect_stack, sky, fail_sound_duration),
+        output,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute how runs end without rendering them")
+    parser.add_argument("--seed", type=int, default=0, help="First seed to simulate")
+    parser.add_argument("--count", type=int, default=1, help="Number of consecutive seeds")
+    parser.add_argument(
+        "--perfect-stack",
+        action="store_true",
+        help="Empile automatiquement les blocs sans mouvement de grue",
+    )
+    parser.add_argument(
+        "--sky",
+        type=str,
+        choices=config.SKY_OPTIONS,
+        default=None,
+        help="Choisir un fond de ciel spécifique",
+    )
+    parser.add_argument(
+        "--fail-sound-duration",
+        type=float,
+        default=None,
+        help=(
+            "Length in seconds of the failure crowd sound to leave room for, "
+            "the fail_crowd asset by default"
+        ),
+    )
+    parser.add_argument(
+        "--no-audio",
+        action="store_true",
+        help="Match clips rendered without audio, whose fail end screen is not stretched",
+    )
+    parser.add_argument("--output", default=None, help="JSONL file to write instead of stdout")
+    args = parser.parse_args()
+    main(
+        args.seed,
+        args.count,
+        args.perfect_stack,
+        args.sky,
+        0.0 if args.no_audio else args.fail_sound_duration,
+        args.output,
+    )
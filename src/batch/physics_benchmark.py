@@ -0,0 +1,129 @@
+"""Compare the physics profiles of ``config.PHYSICS_PROFILES``.
+
+Two measures are taken for each profile: the cost of one frame once a tower
+has settled, where sleeping pays off, and whole runs evaluated with
+:func:`~.simulate.simulate_outcome`, timed and compared to the runs of a
+reference profile on the same seeds, ``legacy`` by default.
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+from .. import config
+from ..physics_sim import block, space_builder
+from ..physics_sim.spatial_index import BlockIndex
+from .calibrate import overridden
+from .simulate import simulate_outcome
+
+
+@dataclass(frozen=True)
+class ProfileReport:
+    """Measures of one physics profile.
+
+    ``agreement`` is the share of seeds ending in the same state as with the
+    reference profile and ``remaining_error`` the mean absolute difference of
+    ``final_remaining`` over the seeds both won.
+    """
+
+    profile: str
+    settled_frame_ms: float
+    sleeping: int
+    run_ms: float
+    win_rate: float
+    agreement: float
+    remaining_error: float
+
+    def summary(self) -> str:
+        return (
+            f"{self.profile:>14}: settled frame {self.settled_frame_ms:.3f} ms "
+            f"({self.sleeping} asleep), run {self.run_ms:.1f} ms, "
+            f"win rate {self.win_rate:.1%}, agreement {self.agreement:.1%}, "
+            f"remaining error {self.remaining_error:.3f} s"
+        )
+
+
+def settled_frame_time(profile: str, blocks: int = 10, frames: int = 300) -> tuple[float, int]:
+    """Return the mean milliseconds of a frame on a settled tower and its sleeping blocks.
+
+    A frame is a physics step followed by the per-frame index and adhesion
+    passes of the simulation. The tower gets two seconds to settle first.
+    """
+    space = space_builder.init_space(profile)
+    height = config.BLOCK_SIZE[1]
+    bodies = [
+        block.create_block(space, config.WIDTH / 2, config.FLOOR_Y + 5 + height / 2 + i * height)
+        for i in range(blocks)
+    ]
+
+    def frame() -> None:
+        space.step(1 / config.FPS)
+        space_builder.apply_adhesion_forces(space, BlockIndex(bodies))
+
+    for _ in range(2 * config.FPS):
+        frame()
+    start = time.perf_counter()
+    for _ in range(frames):
+        frame()
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / frames, sum(body.is_sleeping for body in bodies)
+
+
+def compare_profiles(
+    seeds: Iterable[int],
+    profiles: Iterable[str] | None = None,
+    reference: str = "legacy",
+    perfect_stack: bool = False,
+) -> list[ProfileReport]:
+    """Return a :class:`ProfileReport` for each of ``profiles``, all of them by default."""
+    seeds = list(seeds)
+    profiles = list(profiles or config.PHYSICS_PROFILES)
+    outcomes = {}
+    run_ms = {}
+    for profile in dict.fromkeys([reference, *profiles]):
+        start = time.perf_counter()
+        with overridden({"PHYSICS_PROFILE": profile}):
+            outcomes[profile] = [simulate_outcome(seed, perfect_stack) for seed in seeds]
+        run_ms[profile] = (time.perf_counter() - start) * 1000 / max(1, len(seeds))
+
+    reports = []
+    for profile in profiles:
+        pairs = list(zip(outcomes[profile], outcomes[reference]))
+        same = sum(a.state == b.state for a, b in pairs)
+        won = [(a, b) for a, b in pairs if a.state == b.state == "victory"]
+        error = sum(abs(a.final_remaining - b.final_remaining) for a, b in won) / max(1, len(won))
+        frame_ms, sleeping = settled_frame_time(profile)
+        reports.append(
+            ProfileReport(
+                profile=profile,
+                settled_frame_ms=frame_ms,
+                sleeping=sleeping,
+                run_ms=run_ms[profile],
+                win_rate=sum(a.state == "victory" for a, _ in pairs) / max(1, len(pairs)),
+                agreement=same / max(1, len(pairs)),
+                remaining_error=error,
+            )
+        )
+    return reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare step time and outcomes of physics profiles")
+    parser.add_argument("--seed", type=int, default=0, help="First seed of the runs")
+    parser.add_argument("--runs", type=int, default=50, help="Runs per profile")
+    parser.add_argument(
+        "--reference",
+        choices=list(config.PHYSICS_PROFILES),
+        default="legacy",
+        help="Profile the outcomes are compared to",
+    )
+    parser.add_argument(
+        "--perfect-stack",
+        action="store_true",
+        help="Empile automatiquement les blocs sans mouvement de grue",
+    )
+    args = parser.parse_args()
+    seeds = range(args.seed, args.seed + args.runs)
+    for report in compare_profiles(seeds, reference=args.reference, perfect_stack=args.perfect_stack):
+        print(report.summary())
@@ -0,0 +1,386 @@
+"""Rendering half of a run: replay a recorded trace into video frames."""
+
+import argparse
+import hashlib
+import os
+import random
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Iterator, Optional, Tuple
+
+import pygame
+import numpy as np
+from pydub import AudioSegment
+
+from .. import config
+from ..renderer import pygame_renderer, overlays
+from ..audio import sound_manager
+from ..video_export import stream_writer
+from . import cache, trace as trace_mod
+
+
+_EFFECT_COLORS = {
+    trace_mod.EFFECT_IMPACT: config.IMPACT_FLASH_COLOR,
+    trace_mod.EFFECT_GLOW: config.GLOW_COLOR,
+}
+
+
+def _variant(trace: trace_mod.SimulationTrace, index: int) -> str | None:
+    return None if index < 0 else trace.variants[index]
+
+
+def _intro_style(sky: str) -> str | None:
+    return config.INTRO_STYLE_BY_SKY.get(sky, config.DEFAULT_INTRO_STYLE_NAME)
+
+
+def draw_intro_frame(
+    screen: pygame.Surface,
+    trace: trace_mod.SimulationTrace,
+    assets,
+    sky: str,
+) -> pygame.Surface:
+    """Draw the intro screen of ``trace`` onto ``screen`` and return it."""
+    preview = _variant(trace, trace.intro_preview)
+    pygame_renderer.render_state(screen, assets, trace.width // 2, sky, preview, ())
+    style_name = _intro_style(sky)
+    # The grain only depends on what the intro shows so that the frame can be
+    # shared by every run with the same sky, preview and style.
+    grain_rng = random.Random(f"{sky}:{preview}:{style_name}")
+    overlays.draw_intro(screen, style_name=style_name, rng=grain_rng)
+    return screen
+
+
+# Intro frames already rendered by this process, by ``_intro_key``
+_INTRO_FRAMES: dict[str, np.ndarray] = {}
+
+
+def _intro_key(trace: trace_mod.SimulationTrace, sky: str, size: Tuple[int, int]) -> str:
+    preview = _variant(trace, trace.intro_preview)
+    parts = (
+        cache.CACHE_VERSION,
+        sky,
+        preview,
+        _intro_style(sky),
+        size,
+        cache.config_fingerprint(),
+        cache.assets_fingerprint(),
+    )
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def intro_frame(
+    trace: trace_mod.SimulationTrace,
+    assets,
+    sky: str,
+    size: Tuple[int, int],
+) -> np.ndarray:
+    """Return the intro frame of ``trace``, rendering it only on a cache miss.
+
+    Nothing moves during the intro, so a single frame is drawn per sky,
+    preview variant, style and size. It is kept in memory for the lifetime of
+    the process and, when ``config.OUTPUT_CACHE_ENABLED`` is set, saved under
+    ``config.INTRO_CACHE_DIR`` for later runs and other workers.
+    """
+    key = _intro_key(trace, sky, size)
+    frame = _INTRO_FRAMES.get(key)
+    if frame is not None:
+        return frame
+    path = os.path.join(config.INTRO_CACHE_DIR, f"{key}.npy")
+    if config.OUTPUT_CACHE_ENABLED and os.path.exists(path):
+        frame = np.load(path)
+    else:
+        screen = pygame.Surface((trace.width, trace.height))
+        frame = surface_to_frame(draw_intro_frame(screen, trace, assets, sky), size)
+        if config.OUTPUT_CACHE_ENABLED:
+            os.makedirs(config.INTRO_CACHE_DIR, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as fh:
+                np.save(fh, frame)
+            os.replace(tmp, path)
+    frame.flags.writeable = False
+    _INTRO_FRAMES[key] = frame
+    return frame
+
+
+def draw_frame(
+    screen: pygame.Surface,
+    trace: trace_mod.SimulationTrace,
+    frame: int,
+    assets,
+    sky: str,
+    view: Optional[pygame.Surface] = None,
+) -> pygame.Surface:
+    """Draw recorded ``frame`` and return the surface with the camera applied.
+
+    ``view`` is the surface, the size of ``screen``, the camera draws into
+    when it moves; see :func:`~src.renderer.pygame_renderer.apply_camera`.
+    """
+    bodies = [
+        (
+            trace.variants[int(row[trace_mod.BODY_VARIANT])],
+            row[trace_mod.BODY_X],
+            row[trace_mod.BODY_Y],
+            row[trace_mod.BODY_ANGLE],
+            _body_effect(row),
+        )
+        for row in trace.frame_bodies(frame)
+    ]
+    pygame_renderer.render_state(
+        screen,
+        assets,
+        float(trace.crane_x[frame]),
+        sky,
+        _variant(trace, int(trace.preview[frame])),
+        bodies,
+        trace.frame_confetti(frame),
+    )
+    overlays.draw_timer(screen, float(trace.remaining[frame]))
+    if trace.phase[frame] == trace_mod.PHASE_END:
+        if trace.state == "victory":
+            overlays.draw_victory(screen)
+        else:
+            overlays.draw_fail(screen)
+    offset_x, offset_y, zoom = (float(v) for v in trace.camera[frame])
+    return pygame_renderer.apply_camera(screen, (offset_x, offset_y), zoom, view)
+
+
+def _body_effect(row: np.ndarray):
+    effect = int(row[trace_mod.BODY_EFFECT])
+    if effect == trace_mod.EFFECT_NONE:
+        return None
+    return _EFFECT_COLORS[effect], int(row[trace_mod.BODY_ALPHA])
+
+
+def surface_to_frame(
+    surface: pygame.Surface,
+    size: Tuple[int, int],
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Return ``surface`` as an ``(height, width, 3)`` array of the given size.
+
+    The pixels are copied once into ``out`` when given, see
+    :func:`~src.renderer.pygame_renderer.grab_frame`.
+    """
+    if surface.get_size() != size:
+        surface = pygame.transform.smoothscale(surface, size)
+    return pygame_renderer.grab_frame(surface, out)
+
+
+def replay_frames(
+    trace: trace_mod.SimulationTrace,
+    assets,
+    sky: str | None = None,
+    size: Optional[Tuple[int, int]] = None,
+) -> Iterator[np.ndarray]:
+    """Yield every frame of ``trace``, intro included.
+
+    ``sky`` and ``size`` override the background and output resolution the
+    run was simulated with. The intro frames are all the same read-only
+    array from :func:`intro_frame`. The other frames are slots of a
+    :class:`~src.renderer.pygame_renderer.FrameRing` and are overwritten
+    ``config.FRAME_RING_SLOTS`` frames later: copy any frame kept longer.
+    """
+    sky = sky or trace.sky
+    size = size or (trace.width, trace.height)
+    intro = intro_frame(trace, assets, sky, size)
+    for _ in range(trace.intro_frames):
+        yield intro
+    screen = pygame.Surface((trace.width, trace.height))
+    view = pygame.Surface((trace.width, trace.height))
+    ring = pygame_renderer.FrameRing(size)
+    for frame in range(trace.frame_count):
+        surface = draw_frame(screen, trace, frame, assets, sky, view)
+        yield surface_to_frame(surface, size, ring.next())
+
+
+# State set up once by each pool worker in ``_init_render_worker``
+_WORKER: dict = {}
+
+# Cache settings handed to render workers, which re-import ``config``
+_WORKER_CACHE_SETTINGS = ("OUTPUT_CACHE_ENABLED", "OUTPUT_CACHE_DIR", "INTRO_CACHE_DIR", "FONT_CACHE_PATH")
+
+
+def _init_render_worker(trace, sky, size, shm_name: str, slots: int, cache_settings: dict) -> None:
+    """Load assets and attach the shared frame ring for a render worker.
+
+    ``cache_settings`` are the parent's values of ``_WORKER_CACHE_SETTINGS``,
+    so that workers read and write the same caches.
+    """
+    for name, value in cache_settings.items():
+        setattr(config, name, value)
+    width, height = size
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _WORKER["shm"] = shm
+    _WORKER["ring"] = np.ndarray((slots, height, width, 3), dtype=np.uint8, buffer=shm.buf)
+    _WORKER["assets"] = pygame_renderer.load_assets()
+    _WORKER["screen"] = pygame.Surface((trace.width, trace.height))
+    _WORKER["view"] = pygame.Surface((trace.width, trace.height))
+    _WORKER["trace"] = trace
+    _WORKER["sky"] = sky
+    _WORKER["size"] = size
+
+
+def _render_intro() -> np.ndarray:
+    """Return the intro frame, rendered with the worker's assets if needed."""
+    return intro_frame(_WORKER["trace"], _WORKER["assets"], _WORKER["sky"], _WORKER["size"])
+
+
+def _render_into_ring(frame: int) -> int:
+    """Render recorded ``frame`` into its slot of the shared ring."""
+    ring = _WORKER["ring"]
+    surface = draw_frame(
+        _WORKER["screen"],
+        _WORKER["trace"],
+        frame,
+        _WORKER["assets"],
+        _WORKER["sky"],
+        _WORKER["view"],
+    )
+    surface_to_frame(surface, _WORKER["size"], ring[frame % len(ring)])
+    return frame
+
+
+def replay_frames_parallel(
+    trace: trace_mod.SimulationTrace,
+    workers: int,
+    sky: str | None = None,
+    size: Optional[Tuple[int, int]] = None,
+    slots: int = config.RENDER_RING_SLOTS,
+) -> Iterator[np.ndarray]:
+    """Yield the frames of ``trace`` in order, rendered by ``workers`` processes.
+
+    Each worker loads the assets once and draws whole frames into a ring in
+    shared memory, so only frame indices go through the pool pipes. At most
+    ``slots`` frames are in flight. Frames are yielded as views of the ring,
+    without a copy, and like in :func:`replay_frames` stay valid for
+    ``config.FRAME_RING_SLOTS`` frames: the ring holds that many more slots
+    and a slot is handed out again only once its frame is that old. The
+    intro frame comes from :func:`intro_frame` and is only drawn by a worker
+    when it is not cached yet.
+    """
+    import multiprocessing
+
+    sky = sky or trace.sky
+    size = size or (trace.width, trace.height)
+    width, height = size
+    total = slots + config.FRAME_RING_SLOTS
+    shm = shared_memory.SharedMemory(create=True, size=total * height * width * 3)
+    ring = np.ndarray((total, height, width, 3), dtype=np.uint8, buffer=shm.buf)
+    try:
+        # ``spawn`` gives every worker a fresh pygame/SDL state.
+        ctx = multiprocessing.get_context("spawn")
+        cache_settings = {name: getattr(config, name) for name in _WORKER_CACHE_SETTINGS}
+        initargs = (trace, sky, size, shm.name, total, cache_settings)
+        with ctx.Pool(workers, initializer=_init_render_worker, initargs=initargs) as pool:
+            key = _intro_key(trace, sky, size)
+            intro = _INTRO_FRAMES.get(key)
+            if intro is None:
+                intro = pool.apply(_render_intro)
+                intro.flags.writeable = False
+                _INTRO_FRAMES[key] = intro
+            for _ in range(trace.intro_frames):
+                yield intro
+            pending: deque = deque()
+            submitted = 0
+            for frame in range(trace.frame_count):
+                while submitted < trace.frame_count and len(pending) < slots:
+                    pending.append(pool.apply_async(_render_into_ring, (submitted,)))
+                    submitted += 1
+                pending.popleft().get()
+                yield ring[frame % total]
+    finally:
+        del ring
+        shm.close()
+        shm.unlink()
+
+
+def mix_audio(trace: trace_mod.SimulationTrace, sounds=None) -> AudioSegment:
+    """Return the soundtrack matching the events recorded in ``trace``."""
+    if sounds:
+        return sound_manager.mix_tracks(
+            trace.audio_duration,
+            trace.events,
+            sounds,
+            rng=random.Random(trace.seed),
+        )
+    return AudioSegment.silent(duration=trace.audio_duration * 1000)
+
+
+def render(
+    trace: trace_mod.SimulationTrace,
+    assets,
+    sounds,
+    output: str,
+    sky: str | None = None,
+    size: Optional[Tuple[int, int]] = None,
+    workers: int | None = None,
+) -> None:
+    """Replay ``trace`` into an MP4 file at ``output``.
+
+    With ``workers`` the frames are rendered by a process pool instead of in
+    this process; ``assets`` is then unused since each worker loads its own.
+    """
+    # The soundtrack only depends on the trace, so it is mixed first and
+    # streamed to the encoder along with the frames.
+    writer = stream_writer.StreamWriter(
+        output,
+        size=size or (trace.width, trace.height),
+        fps=trace.fps,
+        audio=mix_audio(trace, sounds),
+    )
+    if workers:
+        frames = replay_frames_parallel(trace, workers, sky=sky, size=size)
+    else:
+        frames = replay_frames(trace, assets, sky=sky, size=size)
+    try:
+        for frame in frames:
+            writer.write(frame)
+    except BaseException:
+        frames.close()
+        writer.abort()
+        raise
+    writer.close()
+
+
+def _parse_size(value: str) -> Tuple[int, int]:
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a recorded crane run trace")
+    parser.add_argument("trace", help="Path of the .npz trace to replay")
+    parser.add_argument("output", help="Path of the MP4 file to write")
+    parser.add_argument(
+        "--no-audio", action="store_true", help="Disable sound track generation"
+    )
+    parser.add_argument(
+        "--sky",
+        type=str,
+        choices=config.SKY_OPTIONS,
+        default=None,
+        help="Choisir un autre fond de ciel que celui de la simulation",
+    )
+    parser.add_argument(
+        "--size",
+        type=_parse_size,
+        default=None,
+        help="Output resolution as WIDTHxHEIGHT",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Render the frames of the clip in a pool of N worker processes",
+    )
+    args = parser.parse_args()
+    recorded = trace_mod.load_trace(args.trace)
+    render(
+        recorded,
+        None if args.workers else pygame_renderer.load_assets(),
+        None if args.no_audio else sound_manager.load_sounds(),
+        args.output,
+        sky=args.sky,
+        size=args.size,
+        workers=args.workers,
+    )
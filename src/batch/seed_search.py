@@ -0,0 +1,281 @@
+"""Search seeds whose run ends in a given way, without rendering them.
+
+Seeds are evaluated with :func:`~.simulate.simulate_outcome` and kept when a
+predicate over the resulting :class:`~.trace.Outcome` holds. Predicates are
+small picklable objects so that they can be sent to pool workers, and they
+combine with ``&``, ``|`` and ``~``::
+
+    won_late = Where("state", "==", "victory") & Where("final_remaining", "<", 1.5)
+    clean = Where("despawn_count", "==", 0)
+    search(won_late & clean, start=0, count=10_000, workers=8, limit=20)
+
+A field is an attribute of the outcome, or ``events.<name>`` for the number
+of events called ``name``.
+"""
+
+import argparse
+import operator
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional, get_type_hints
+
+from .. import config
+from .outcome import write_outcomes
+from .simulate import simulate_outcome
+from .trace import Outcome
+
+_OPERATORS: dict[str, Callable] = {
+    "<=": operator.le,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "=": operator.eq,
+}
+
+
+class Predicate(ABC):
+    """Condition on an :class:`~.trace.Outcome`, combinable with ``&``, ``|`` and ``~``."""
+
+    @abstractmethod
+    def __call__(self, outcome: Outcome) -> bool:
+        """Return whether ``outcome`` satisfies the condition."""
+
+    def __and__(self, other: "Predicate") -> "Predicate":
+        return AllOf((self, other))
+
+    def __or__(self, other: "Predicate") -> "Predicate":
+        return AnyOf((self, other))
+
+    def __invert__(self) -> "Predicate":
+        return Not(self)
+
+
+@dataclass(frozen=True)
+class Where(Predicate):
+    """Compare ``field`` of the outcome to ``value`` with ``op``, one of ``_OPERATORS``."""
+
+    field: str
+    op: str
+    value: object
+
+    def __post_init__(self) -> None:
+        if self.op not in _OPERATORS:
+            raise ValueError(f"Unknown operator '{self.op}'. Valid options are: {list(_OPERATORS)}")
+        if not self.field.startswith("events.") and self.field not in Outcome.__dataclass_fields__:
+            raise ValueError(f"Unknown outcome field '{self.field}'")
+        if not _comparable(self.field, self.value):
+            raise ValueError(
+                f"Outcome field '{self.field}' can never match {self.value!r} "
+                f"of type {type(self.value).__name__}"
+            )
+
+    def __call__(self, outcome: Outcome) -> bool:
+        if self.field.startswith("events."):
+            name = self.field[len("events."):]
+            actual = sum(1 for _, event in outcome.events if event == name)
+        else:
+            actual = getattr(outcome, self.field)
+        return _OPERATORS[self.op](actual, self.value)
+
+
+def _comparable(field: str, value: object) -> bool:
+    """Return whether ``value`` has a type that ``field`` of an outcome can match."""
+    hint = int if field.startswith("events.") else get_type_hints(Outcome)[field]
+    if hint is bool:
+        return isinstance(value, bool)
+    if hint is str:
+        return isinstance(value, str)
+    if hint in (int, float, Optional[int]):
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return True
+
+
+@dataclass(frozen=True)
+class AllOf(Predicate):
+    """Hold when every predicate of ``predicates`` holds."""
+
+    predicates: tuple[Predicate, ...]
+
+    def __call__(self, outcome: Outcome) -> bool:
+        return all(predicate(outcome) for predicate in self.predicates)
+
+
+@dataclass(frozen=True)
+class AnyOf(Predicate):
+    """Hold when at least one predicate of ``predicates`` holds."""
+
+    predicates: tuple[Predicate, ...]
+
+    def __call__(self, outcome: Outcome) -> bool:
+        return any(predicate(outcome) for predicate in self.predicates)
+
+
+@dataclass(frozen=True)
+class Not(Predicate):
+    """Hold when ``predicate`` does not."""
+
+    predicate: Predicate
+
+    def __call__(self, outcome: Outcome) -> bool:
+        return not self.predicate(outcome)
+
+
+def parse_condition(text: str) -> Where:
+    """Parse a condition such as ``"final_remaining<1.5"`` or ``"state=victory"``.
+
+    Values that read as numbers are compared as numbers, ``true`` and
+    ``false`` in any case as booleans, and others as strings.
+    """
+    for op in _OPERATORS:
+        field, sep, value = text.partition(op)
+        if sep:
+            break
+    else:
+        raise ValueError(f"No comparison operator in condition '{text}'")
+    value = value.strip()
+    parsed: object
+    if value.lower() in ("true", "false"):
+        parsed = value.lower() == "true"
+    else:
+        try:
+            parsed = float(value)
+        except ValueError:
+            parsed = value
+    return Where(field.strip(), op, parsed)
+
+
+def _evaluate(
+    seeds: range,
+    predicate: Predicate,
+    perfect_stack: bool | None,
+    sky: str | None,
+    fail_sound_duration: float | None,
+) -> list[Outcome]:
+    """Return the outcomes of ``seeds`` matching ``predicate``, in seed order."""
+    found = []
+    for seed in seeds:
+        outcome = simulate_outcome(seed, perfect_stack, sky, fail_sound_duration)
+        if predicate(outcome):
+            found.append(outcome)
+    return found
+
+
+def _evaluate_chunk(args) -> list[Outcome]:
+    return _evaluate(*args)
+
+
+def search(
+    predicate: Predicate,
+    start: int,
+    count: int,
+    workers: int | None = None,
+    limit: int | None = None,
+    chunk_size: int = 16,
+    perfect_stack: bool | None = None,
+    sky: str | None = None,
+    fail_sound_duration: float | None = None,
+) -> Iterator[Outcome]:
+    """Yield the outcomes of seeds ``start`` to ``start + count - 1`` matching ``predicate``.
+
+    Without ``workers`` seeds are evaluated here, in order. With ``workers``
+    chunks of ``chunk_size`` seeds are spread over a process pool and
+    matches are yielded as chunks complete, so not necessarily in seed
+    order. The search stops once ``limit`` matches have been yielded.
+    The remaining arguments are those of
+    :func:`~.simulate.simulate_outcome`.
+    """
+    if limit is not None and limit <= 0:
+        return
+    options = (predicate, perfect_stack, sky, fail_sound_duration)
+    chunks = (
+        (range(first, min(first + chunk_size, start + count)), *options)
+        for first in range(start, start + count, chunk_size)
+    )
+    found = 0
+    if workers:
+        import multiprocessing
+
+        ctx = multiprocessing.get_context("spawn")
+        # Leaving the ``with`` block terminates the workers still evaluating
+        # chunks once enough matches are found.
+        with ctx.Pool(workers) as pool:
+            for outcomes in pool.imap_unordered(_evaluate_chunk, chunks):
+                for outcome in outcomes:
+                    yield outcome
+                    found += 1
+                    if found == limit:
+                        return
+        return
+    for chunk in chunks:
+        for outcome in _evaluate_chunk(chunk):
+            yield outcome
+            found += 1
+            if found == limit:
+                return
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Find seeds whose run matches conditions, without rendering them"
+    )
+    parser.add_argument(
+        "--where",
+        action="append",
+        default=[],
+        metavar="CONDITION",
+        help=(
+            "Condition on the outcome, such as 'state=victory', 'final_remaining<1.5', "
+            "'block_count>=8', 'despawn_count=0' or 'events.impact>=5'; all must hold"
+        ),
+    )
+    parser.add_argument("--seed", type=int, default=0, help="First seed to evaluate")
+    parser.add_argument("--count", type=int, default=1000, help="Number of consecutive seeds")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many matches")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Evaluate seeds in a pool of N worker processes",
+    )
+    parser.add_argument("--chunk-size", type=int, default=16, help="Seeds per pool task")
+    parser.add_argument(
+        "--perfect-stack",
+        action="store_true",
+        help="Empile automatiquement les blocs sans mouvement de grue",
+    )
+    parser.add_argument(
+        "--sky",
+        type=str,
+        choices=config.SKY_OPTIONS,
+        default=None,
+        help="Choisir un fond de ciel spécifique",
+    )
+    parser.add_argument(
+        "--fail-sound-duration",
+        type=float,
+        default=None,
+        help=(
+            "Length in seconds of the failure crowd sound to leave room for, "
+            "the fail_crowd asset by default"
+        ),
+    )
+    parser.add_argument("--output", default=None, help="JSONL file to write instead of stdout")
+    args = parser.parse_args()
+    try:
+        condition = AllOf(tuple(parse_condition(text) for text in args.where))
+    except ValueError as error:
+        parser.error(str(error))
+    matches = search(
+        condition,
+        args.seed,
+        args.count,
+        workers=args.workers,
+        limit=args.limit,
+        chunk_size=args.chunk_size,
+        perfect_stack=args.perfect_stack,
+        sky=args.sky,
+        fail_sound_duration=args.fail_sound_duration,
+    )
+    write_outcomes(matches, args.output)
@@ -0,0 +1,528 @@
+"""Physics half of a run: simulate a challenge and record it as a trace."""
+
+import argparse
+import math
+import random
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import numpy as np
+import pymunk
+
+from .. import config
+from ..audio import sound_info
+from ..physics_sim import space_builder, block
+from ..physics_sim.impacts import ImpactMonitor
+from ..physics_sim.spatial_index import BlockIndex
+from ..physics_sim.tower_graph import TowerGraph
+from ..renderer.confetti import ConfettiSystem
+from . import trace as trace_mod
+
+
+def choose_block_variant(variants, history: deque, rng: random.Random | None = None) -> str:
+    """Return a variant avoiding long consecutive repeats."""
+    rng = rng or random
+    if len(variants) <= 1:
+        choice = variants[0]
+    else:
+        # Exclude variant if it already appears twice consecutively
+        banned = None
+        if len(history) >= 2 and history[-1] == history[-2]:
+            banned = history[-1]
+        available = [v for v in variants if v != banned] if banned else variants
+        choice = rng.choice(available)
+    history.append(choice)
+    if len(history) > 2:
+        history.popleft()
+    return choice
+
+
+# Passes of a play frame run by :func:`step_frame`, in order; ``step`` is
+# Pymunk, the others Python
+FRAME_PASSES = ("step", "index", "forces", "registry", "support")
+
+
+def step_frame(
+    space: pymunk.Space,
+    blocks: block.BlockRegistry,
+    contacts: TowerGraph,
+    impacts: ImpactMonitor,
+    rng: random.Random,
+    on_impact: Callable[[tuple, float], None] | None = None,
+    timings: dict | None = None,
+) -> tuple[list[pymunk.Body], float | None, int]:
+    """Advance one play frame and run its per-frame passes on every block.
+
+    The physics is stepped and each new impact handed to
+    ``on_impact(shapes, strength)``. The bug and adhesion forces are then
+    applied through a :class:`~..physics_sim.spatial_index.BlockIndex` of the
+    blocks, their flash timers run down, and the contact graph decides which
+    resting blocks are supported: the others count towards their despawn and
+    falling blocks out of sight are removed.
+
+    Returns the resting blocks, the height of the tower they form (``None``
+    without any) and the number of blocks that started to despawn. When
+    ``timings`` is given, the seconds spent in each of ``FRAME_PASSES`` are
+    added to it.
+    """
+    lap = _lap_timer(timings)
+    dt = 1 / config.FPS
+    space.step(dt)
+    for shapes, strength in impacts.collect():
+        if on_impact is not None:
+            on_impact(shapes, strength)
+    lap("step")
+
+    dynamic_bodies = [blocks.bodies[block_id] for block_id in blocks.ids()]
+    index = BlockIndex(dynamic_bodies)
+    lap("index")
+
+    space_builder.apply_bug_forces(space, rng)
+    space_builder.apply_adhesion_forces(space, index)
+    lap("forces")
+
+    blocks.tick(dt)
+    resting = [b for b in dynamic_bodies if abs(b.velocity.y) < 1]
+    lap("registry")
+
+    resting_ids = np.array([b.block_id for b in resting], dtype=np.intp)
+    kept = _kept_blocks(space, blocks, contacts, dynamic_bodies, resting, resting_ids)
+    blocks.unsupported[resting_ids[kept]] = 0.0
+    blocks.unsupported[resting_ids[~kept]] += dt
+    despawned = 0
+    if config.BLOCK_DESPAWN_ENABLED:
+        candidates = resting_ids[~kept]
+        expired = candidates[blocks.unsupported[candidates] >= config.BLOCK_DESPAWN_DELAY]
+        despawned = len(expired)
+        for block_id in expired:
+            b = blocks.bodies[block_id]
+            # A block can expire while asleep, lying on its side
+            b.activate()
+            for s in b.shapes:
+                s.sensor = True
+            contacts.discard(b)
+            b.velocity = (0, -300)
+            blocks.flags[block_id] |= blocks.FALLING
+
+    for block_id in blocks.with_flag(blocks.FALLING):
+        b = blocks.bodies[block_id]
+        if b.position.y < -config.BLOCK_SIZE[1]:
+            space.remove(b, *b.shapes)
+            blocks.remove(block_id)
+
+    top = contacts.max_height(resting)
+    lap("support")
+    return resting, top, despawned
+
+
+def _lap_timer(timings: dict | None):
+    """Return a function adding the time since its last call to ``timings[name]``."""
+    if timings is None:
+        return lambda name: None
+    last = [time.perf_counter()]
+
+    def lap(name: str) -> None:
+        now = time.perf_counter()
+        timings[name] += now - last[0]
+        last[0] = now
+
+    return lap
+
+
+def _is_tilted(body: pymunk.Body) -> bool:
+    angle = abs(body.angle % math.pi)
+    if angle > math.pi / 2:
+        angle = math.pi - angle
+    return angle > config.BLOCK_SIDE_ANGLE
+
+
+def _kept_blocks(
+    space: pymunk.Space,
+    blocks: block.BlockRegistry,
+    contacts: TowerGraph,
+    dynamic_bodies: list[pymunk.Body],
+    resting: list[pymunk.Body],
+    resting_ids: np.ndarray,
+) -> np.ndarray:
+    """Return which of the ``resting`` blocks are exempt from despawning this frame.
+
+    Pymunk puts touching blocks to sleep together, so neither a sleeping
+    block nor its neighbours move. Its check is then reused, through the
+    ``SETTLED`` and ``KEPT`` flags of ``blocks``, until it wakes up or its
+    contacts change.
+    """
+    changed = contacts.pop_changed()
+    if math.isinf(space.sleep_time_threshold):
+        return np.array([_is_kept(b, contacts) for b in resting], dtype=bool)
+    stale = [b.block_id for b in dynamic_bodies if not b.is_sleeping]
+    stale.extend(b.block_id for b in changed)
+    blocks.flags[np.array(stale, dtype=np.intp)] &= ~np.uint8(blocks.SETTLED | blocks.KEPT)
+
+    flags = blocks.flags[resting_ids]
+    kept = (flags & blocks.KEPT) != 0
+    for i in np.flatnonzero((flags & blocks.SETTLED) == 0):
+        body = resting[i]
+        kept[i] = _is_kept(body, contacts)
+        if body.is_sleeping:
+            blocks.flags[body.block_id] |= blocks.SETTLED | (blocks.KEPT if kept[i] else 0)
+    return kept
+
+
+def _is_kept(body: pymunk.Body, contacts: TowerGraph) -> bool:
+    """Return whether a resting block is exempt from despawning this frame."""
+    on_floor = contacts.touches_floor(body)
+    block_on_top = contacts.has_block_on_top(body)
+    protected_first = body.block_id == 0 and on_floor and not block_on_top
+    return (
+        protected_first
+        or (not on_floor and not _is_tilted(body))
+        or block_on_top
+    )
+
+
+def simulate(
+    seed: Optional[int] = None,
+    perfect_stack: bool | None = None,
+    sky: str | None = None,
+    fail_sound_duration: float | None = None,
+) -> trace_mod.SimulationTrace:
+    """Simulate a whole run and return its :class:`~.trace.SimulationTrace`.
+
+    ``sky`` can be one of the names defined in ``config.SKY_OPTIONS`` to force
+    a specific background. ``fail_sound_duration`` is the length in seconds of
+    the crowd sound played on failure; the end screen is stretched to let it
+    finish.
+    """
+    return _run(seed, perfect_stack, sky, fail_sound_duration, record=True)
+
+
+def simulate_outcome(
+    seed: Optional[int] = None,
+    perfect_stack: bool | None = None,
+    sky: str | None = None,
+    fail_sound_duration: float | None = None,
+) -> trace_mod.Outcome:
+    """Return how the run :func:`simulate` records with the same arguments ends.
+
+    No frame is recorded and no confetti is animated, but the random draws
+    and the physics are the same, end screen included since blocks may still
+    collide there, so the outcome and events match the rendered clip.
+    Without ``fail_sound_duration`` the end screen is sized for the
+    ``fail_crowd`` sound, like clips rendered with audio; pass 0 to match a
+    clip rendered without audio.
+    """
+    if fail_sound_duration is None:
+        fail_sound_duration = sound_info.fail_sound_duration()
+    return _run(seed, perfect_stack, sky, fail_sound_duration, record=False)
+
+
+def _run(
+    seed: Optional[int],
+    perfect_stack: bool | None,
+    sky: str | None,
+    fail_sound_duration: float | None,
+    record: bool,
+):
+    """Simulate a run, returning its trace when ``record`` is set and its outcome otherwise."""
+    space = space_builder.init_space()
+    recorder = trace_mod.TraceRecorder() if record else None
+    events = []
+    rng = random.Random(seed)
+    if sky is None:
+        sky = rng.choice(config.SKY_OPTIONS)
+    elif sky not in config.SKY_OPTIONS:
+        raise ValueError(f"Unknown sky '{sky}'. Valid options are: {config.SKY_OPTIONS}")
+    crane_x = config.WIDTH // 2
+    if perfect_stack is None:
+        perfect_stack = config.PERFECT_STACK
+    # Oscillation parameters for the crane movement
+    if perfect_stack:
+        amplitude = 0.0
+        frequency = 0.0
+        phase = 0.0
+    else:
+        amplitude = rng.uniform(*config.CRANE_OSC_AMPLITUDE_RANGE)
+        frequency = (
+            rng.uniform(*config.CRANE_OSC_FREQUENCY_RANGE)
+            * config.CRANE_OSC_SPEED_SCALE
+        )
+        phase = rng.uniform(*config.CRANE_OSC_PHASE_RANGE)
+    spawn_y = config.HEIGHT - config.CRANE_DROP_HEIGHT
+    state = None  # "victory" or "fail"
+    # ``sim_time`` tracks the absolute time in the final clip. This starts at
+    # ``INTRO_DURATION`` so that all logged audio events line up with the video
+    # frames once the intro sequence has played. The collision callback reads
+    # it to timestamp impact events.
+    sim_time = {"t": float(config.INTRO_DURATION)}
+    prev_second = config.TIME_LIMIT + 1
+    final_remaining = None
+
+    blocks = block.BlockRegistry()
+    confetti = ConfettiSystem()
+    despawns = 0
+    glow_time = 0.0
+
+    # Camera effect state
+    shake_time = 0.0
+    zoom_time = 0.0
+    cam_phase = rng.uniform(0, 2 * math.pi)
+    cam_axis = rng.choice(["x", "y"])
+    cam_amp = rng.uniform(*config.CAMERA_OSC_AMPLITUDE_RANGE)
+    cam_freq = rng.uniform(*config.CAMERA_OSC_FREQUENCY_RANGE)
+    cam_t = 0.0
+    freeze_scene = False
+    zoom_pending = False
+    end_loop = False
+
+    # Next time (in seconds) a new block should be dropped
+    next_drop_time = 0.0
+
+    IMPACT_THRESHOLD = 300
+
+    def log_impact(shapes, strength: float) -> None:
+        """Record a new contact of the last step if it is strong enough."""
+        nonlocal shake_time
+        if strength >= IMPACT_THRESHOLD:
+            events.append((sim_time["t"], "impact"))
+            for shape in shapes:
+                body = shape.body
+                if body.body_type == pymunk.Body.DYNAMIC:
+                    blocks.flash[body.block_id] = config.IMPACT_FLASH_DURATION
+            shake_time = config.CAMERA_SHAKE_DURATION
+
+    # Only block/block and block/floor contacts are watched, and only when
+    # they begin, instead of every touching pair on every step.
+    impacts = ImpactMonitor(space)
+    # Blocks touching each other and the floor, for the despawn and victory
+    # checks.
+    contacts = TowerGraph(space)
+
+    variant_history: deque = deque(maxlen=2)
+    preview_variant = choose_block_variant(config.BLOCK_VARIANTS, variant_history, rng)
+    intro_preview = config.BLOCK_VARIANTS.index(preview_variant)
+    # Time until which the preview should remain hidden after a drop
+    preview_hidden_until = 0.0
+
+    def record_frame(frame_phase: int, show_preview: str | None, shown_remaining: float, camera) -> None:
+        """Snapshot the visible state of the current frame."""
+        if recorder is None:
+            return
+        ids = blocks.ids()
+        rows = np.zeros((len(ids), trace_mod.BODY_COLUMNS))
+        rows[:, trace_mod.BODY_ID] = ids
+        rows[:, trace_mod.BODY_X:trace_mod.BODY_ANGLE + 1] = np.array(
+            [(b.position.x, b.position.y, b.angle) for b in map(blocks.bodies.__getitem__, ids)],
+            dtype=float,
+        ).reshape(-1, 3)
+        rows[:, trace_mod.BODY_VARIANT] = blocks.variant[ids]
+        flash = blocks.flash[ids]
+        flashing = flash > 0
+        rows[flashing, trace_mod.BODY_EFFECT] = trace_mod.EFFECT_IMPACT
+        rows[flashing, trace_mod.BODY_ALPHA] = (
+            config.IMPACT_FLASH_ALPHA * (flash[flashing] / config.IMPACT_FLASH_DURATION)
+        ).astype(int)
+        if glow_time > 0:
+            glowing = (blocks.flags[ids] & blocks.GLOW) != 0
+            rows[glowing, trace_mod.BODY_EFFECT] = trace_mod.EFFECT_GLOW
+            rows[glowing, trace_mod.BODY_ALPHA] = int(config.GLOW_ALPHA * glow_time / config.GLOW_DURATION)
+        preview_idx = -1 if show_preview is None else config.BLOCK_VARIANTS.index(show_preview)
+        recorder.add_frame(frame_phase, crane_x, preview_idx, shown_remaining, camera, rows, confetti.rows())
+
+    def camera_step():
+        """Advance the camera effects by one frame and return the transform."""
+        nonlocal shake_time, zoom_time, cam_t
+        offset_x = offset_y = 0.0
+        zoom = 1.0
+        if config.CAMERA_EFFECTS_ENABLED:
+            if not freeze_scene:
+                base = cam_amp * math.sin(cam_freq * cam_t + cam_phase)
+                offset_x = base if cam_axis == "x" else 0.0
+                offset_y = base if cam_axis == "y" else 0.0
+                if shake_time > 0:
+                    strength = shake_time / config.CAMERA_SHAKE_DURATION
+                    offset_x += rng.uniform(-1, 1) * config.CAMERA_SHAKE_INTENSITY * strength
+                    offset_y += rng.uniform(-1, 1) * config.CAMERA_SHAKE_INTENSITY * strength
+                    shake_time -= 1 / config.FPS
+                cam_t += 1 / config.FPS
+            if zoom_time > 0:
+                progress = 1 - zoom_time / config.VICTORY_ZOOM_DURATION
+                eased = progress * progress * (3 - 2 * progress)
+                zoom = 1 + config.VICTORY_ZOOM_FACTOR * eased
+                zoom_time -= 1 / config.FPS
+        return (offset_x, offset_y, zoom)
+
+    for i in range(config.TIME_LIMIT * config.FPS):
+        t = i / config.FPS
+        remaining = config.TIME_LIMIT - t
+        secs = int(math.ceil(remaining))
+        if secs < prev_second:
+            if 0 < secs <= 5:
+                # Offset the timer event by the intro duration so it matches
+                # the absolute timestamp used for audio mixing.
+                events.append((config.INTRO_DURATION + t, "timer"))
+            prev_second = secs
+        if state is None and t >= next_drop_time:
+            if perfect_stack:
+                drop_x = crane_x
+                initial_vx = 0.0
+            else:
+                drop_x = crane_x + rng.randint(*config.DROP_VARIATION_RANGE)
+                crane_vx = amplitude * frequency * math.cos(frequency * t + phase)
+                initial_vx = crane_vx * config.DROP_HORIZONTAL_SPEED_FACTOR
+            block.create_block(
+                space,
+                drop_x,
+                config.HEIGHT - config.CRANE_DROP_HEIGHT,
+                preview_variant,
+                initial_velocity=(initial_vx, 0.0),
+                registry=blocks,
+            )
+            delay = config.BLOCK_DROP_INTERVAL + rng.uniform(
+                -config.BLOCK_DROP_JITTER,
+                config.BLOCK_DROP_JITTER,
+            )
+            delay = max(0.5, delay)
+            next_drop_time = t + delay
+            preview_hidden_until = t + config.PREVIEW_HIDE_DURATION
+            preview_variant = choose_block_variant(
+                config.BLOCK_VARIANTS,
+                variant_history,
+                rng,
+            )
+        # Advance the simulation before checking the tower height so that newly
+        # spawned blocks do not immediately trigger a win. ``sim_time`` is
+        # updated with the intro offset so audio timestamps remain consistent
+        # with the rendered frames.
+        sim_time["t"] = config.INTRO_DURATION + (i + 1) / config.FPS
+        resting, top, despawned = step_frame(space, blocks, contacts, impacts, rng, log_impact)
+        despawns += despawned
+
+        if record:
+            confetti.update(1 / config.FPS)
+        if glow_time > 0:
+            glow_time -= 1 / config.FPS
+
+        if state is None:
+            if top is not None and top >= spawn_y:
+                state = "victory"
+                events.append((sim_time["t"], "victory"))
+                remaining_challenge = sim_time["t"] - config.INTRO_DURATION
+                final_remaining = max(0.0, config.TIME_LIMIT - remaining_challenge)
+                confetti.spawn(
+                    config.CONFETTI_COUNT,
+                    config.HEIGHT - spawn_y,
+                    rng,
+                )
+                glow_time = config.GLOW_DURATION
+                tower = [b.block_id for b in contacts.connected_tower(spawn_y, resting)]
+                blocks.flags[tower] |= blocks.GLOW
+                freeze_scene = True
+                zoom_pending = True
+                end_loop = True
+        crane_x = (
+            config.WIDTH // 2
+            + amplitude * math.sin(frequency * t + phase)
+        )
+        crane_x = max(
+            config.CRANE_MOVEMENT_BOUNDS,
+            min(config.WIDTH - config.CRANE_MOVEMENT_BOUNDS, crane_x),
+        )
+        show_preview = preview_variant if t >= preview_hidden_until else None
+        record_frame(trace_mod.PHASE_PLAY, show_preview, remaining, camera_step())
+        if end_loop:
+            break
+    if state is None:
+        state = "fail"
+        final_remaining = 0
+        events.append((sim_time["t"], "fail"))
+    end_duration = config.END_SCREEN_DURATION
+    if state == "fail" and fail_sound_duration:
+        end_duration = max(end_duration, fail_sound_duration + 1)
+
+    end_frames = math.ceil(end_duration * config.FPS)
+
+    for _ in range(end_frames):
+        sim_time["t"] += 1 / config.FPS
+        if not freeze_scene:
+            space.step(1 / config.FPS)
+            for shapes, strength in impacts.collect():
+                log_impact(shapes, strength)
+            space_builder.apply_bug_forces(space, rng)
+            space_builder.apply_adhesion_forces(space)
+            blocks.tick(1 / config.FPS)
+        if record:
+            confetti.update(1 / config.FPS)
+        if glow_time > 0:
+            glow_time -= 1 / config.FPS
+        elif zoom_pending:
+            zoom_time = config.VICTORY_ZOOM_DURATION
+            zoom_pending = False
+
+        show_remaining = 0 if final_remaining is None else final_remaining
+        record_frame(trace_mod.PHASE_END, None, show_remaining, camera_step())
+
+    if not record:
+        return trace_mod.Outcome(
+            seed=seed,
+            sky=sky,
+            perfect_stack=bool(perfect_stack),
+            state=state,
+            final_remaining=float(final_remaining),
+            block_count=len(blocks),
+            impact_count=sum(1 for _, name in events if name == "impact"),
+            despawn_count=despawns,
+            events=events,
+        )
+    return recorder.finish(
+        seed=seed,
+        sky=sky,
+        perfect_stack=bool(perfect_stack),
+        state=state,
+        final_remaining=float(final_remaining),
+        fps=config.FPS,
+        width=config.WIDTH,
+        height=config.HEIGHT,
+        variants=list(config.BLOCK_VARIANTS),
+        intro_frames=config.INTRO_DURATION * config.FPS,
+        intro_preview=intro_preview,
+        audio_duration=config.INTRO_DURATION + config.TIME_LIMIT + end_frames / config.FPS,
+        events=events,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate a crane run and save its trace")
+    parser.add_argument("output", help="Path of the .npz trace to write")
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for a reproducible run",
+    )
+    parser.add_argument(
+        "--perfect-stack",
+        action="store_true",
+        help="Empile automatiquement les blocs sans mouvement de grue",
+    )
+    parser.add_argument(
+        "--sky",
+        type=str,
+        choices=config.SKY_OPTIONS,
+        default=None,
+        help="Choisir un fond de ciel spécifique",
+    )
+    parser.add_argument(
+        "--fail-sound-duration",
+        type=float,
+        default=None,
+        help="Length in seconds of the failure crowd sound to leave room for",
+    )
+    args = parser.parse_args()
+    result = simulate(
+        seed=args.seed,
+        perfect_stack=args.perfect_stack,
+        sky=args.sky,
+        fail_sound_duration=args.fail_sound_duration,
+    )
+    trace_mod.save_trace(result, args.output)
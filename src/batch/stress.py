@@ -0,0 +1,203 @@
+"""Measure how the cost of a frame grows with the number of blocks in the space.
+
+With a long ``TIME_LIMIT`` and despawn disabled, a run can pile up hundreds of
+blocks. This module builds such spaces directly, as piles, upright towers or
+leaning towers collapsing, and times each pass of a simulation frame: the
+Pymunk step, which includes the contact graph callbacks, then the Python
+passes, all run by :func:`~.simulate.step_frame` as in a real run. Fitting
+``time ~ N ** exponent`` over the block counts tells which passes grow faster
+than the number of blocks::
+
+    python -m src.batch.stress --kind tower --counts 25,50,100,200,400
+"""
+
+import argparse
+import math
+import random
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+import pymunk
+
+from .. import config
+from ..physics_sim import block, space_builder
+from ..physics_sim.impacts import ImpactMonitor
+from ..physics_sim.tower_graph import TowerGraph
+from .simulate import FRAME_PASSES, step_frame
+
+SCENARIOS = ("pile", "tower", "collapse")
+
+# Blocks per column of the tower and collapse scenarios
+COLUMN_HEIGHT = 8
+
+# Scaling exponent above which a pass is reported as super-linear
+SUPER_LINEAR_EXPONENT = 1.25
+
+
+def build_scenario(
+    kind: str,
+    count: int,
+    seed: int = 0,
+    profile: str | None = None,
+    spatial_hash: bool | None = None,
+) -> tuple[pymunk.Space, block.BlockRegistry, TowerGraph]:
+    """Return a space holding ``count`` blocks laid out as ``kind``, one of ``SCENARIOS``.
+
+    ``pile`` drops blocks at random positions and angles above a heap,
+    ``tower`` stacks them in upright columns of ``COLUMN_HEIGHT`` blocks and
+    ``collapse`` shifts every level of those columns sideways so that they
+    fall onto each other. The floor is widened to hold every block, with room
+    on both sides for the ones falling off.
+    ``profile`` and ``spatial_hash`` are those of
+    :func:`~..physics_sim.space_builder.init_space`.
+    """
+    if kind not in SCENARIOS:
+        raise ValueError(f"Unknown stress scenario '{kind}'. Valid options are: {list(SCENARIOS)}")
+    rng = random.Random(seed)
+    width, height = config.BLOCK_SIZE
+    columns = math.ceil(count / COLUMN_HEIGHT)
+    pitch = 1.2 * width
+    span = max(config.WIDTH, columns * pitch)
+    space = space_builder.init_space(profile, spatial_hash, floor_width=3 * span)
+    contacts = TowerGraph(space)
+    blocks = block.BlockRegistry()
+
+    base = config.FLOOR_Y + 5 + height / 2
+    for i in range(count):
+        column, level = divmod(i, COLUMN_HEIGHT)
+        x = span + width + column * pitch
+        if kind == "pile":
+            x = span + rng.uniform(width, span - width)
+            y = base + i * height * 2 / max(1, columns)
+        elif kind == "collapse":
+            x += level * width * 0.3
+            y = base + level * height
+        else:
+            y = base + level * height
+        body = block.create_block(space, x, y, registry=blocks)
+        if kind == "pile":
+            body.angle = rng.uniform(-math.pi, math.pi)
+    return space, blocks, contacts
+
+
+@dataclass(frozen=True)
+class StressReport:
+    """Mean milliseconds per frame of each of ``FRAME_PASSES`` for ``count`` blocks."""
+
+    kind: str
+    count: int
+    spatial_hash: bool
+    pass_ms: dict
+
+    @property
+    def frame_ms(self) -> float:
+        return sum(self.pass_ms.values())
+
+    def summary(self) -> str:
+        passes = " ".join(f"{name} {self.pass_ms[name]:.3f}" for name in FRAME_PASSES)
+        broadphase = "hash" if self.spatial_hash else "tree"
+        return (
+            f"{self.kind:>8} {self.count:>5} blocks ({broadphase}): "
+            f"frame {self.frame_ms:.3f} ms = {passes}"
+        )
+
+
+def measure(
+    kind: str,
+    count: int,
+    frames: int = 120,
+    seed: int = 0,
+    profile: str | None = None,
+    spatial_hash: bool = False,
+) -> StressReport:
+    """Time ``frames`` frames of the ``kind`` scenario with ``count`` blocks.
+
+    Every frame is a :func:`~.simulate.step_frame` on all the blocks:
+    ``step`` the physics step and impact collection, ``index`` the
+    :class:`~..physics_sim.spatial_index.BlockIndex` build, ``forces`` the bug
+    and adhesion forces, ``registry`` the flash timers and resting selection,
+    and ``support`` the contact graph checks deciding which blocks are kept
+    and how high the tower is.
+    """
+    space, blocks, contacts = build_scenario(kind, count, seed, profile, spatial_hash)
+    impacts = ImpactMonitor(space)
+    rng = random.Random(seed)
+    totals = dict.fromkeys(FRAME_PASSES, 0.0)
+
+    for _ in range(frames):
+        step_frame(space, blocks, contacts, impacts, rng, timings=totals)
+    pass_ms = {name: total * 1000 / frames for name, total in totals.items()}
+    return StressReport(kind, count, spatial_hash, pass_ms)
+
+
+def scaling_exponents(reports: list[StressReport]) -> dict[str, float]:
+    """Return, for each pass, the slope of log time against log block count.
+
+    1 means the pass grows like the number of blocks, 2 like its square.
+    NaN is returned with fewer than two block counts.
+    """
+    counts = np.log([report.count for report in reports])
+    exponents = {}
+    for name in FRAME_PASSES:
+        times = np.log([max(report.pass_ms[name], 1e-6) for report in reports])
+        if len(set(counts)) < 2:
+            exponents[name] = float("nan")
+        else:
+            exponents[name] = float(np.polyfit(counts, times, 1)[0])
+    return exponents
+
+
+def super_linear(exponents: dict[str, float], threshold: float = SUPER_LINEAR_EXPONENT) -> list[str]:
+    """Return the Python passes among ``exponents`` growing faster than ``threshold``."""
+    return [name for name, value in exponents.items() if name != "step" and value > threshold]
+
+
+def run(
+    kind: str,
+    counts: Iterable[int],
+    frames: int = 120,
+    seed: int = 0,
+    profile: str | None = None,
+    spatial_hash: bool = False,
+) -> list[StressReport]:
+    """Return a :class:`StressReport` for each block count of ``counts``."""
+    return [measure(kind, count, frames, seed, profile, spatial_hash) for count in counts]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report per-frame step time against the number of blocks")
+    parser.add_argument("--kind", choices=SCENARIOS + ("all",), default="all", help="Scenario to build")
+    parser.add_argument(
+        "--counts",
+        default="25,50,100,200",
+        help="Comma separated block counts",
+    )
+    parser.add_argument("--frames", type=int, default=120, help="Frames timed per block count")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the pile layout and bug forces")
+    parser.add_argument(
+        "--profile",
+        choices=list(config.PHYSICS_PROFILES),
+        default=None,
+        help="Physics profile of the space",
+    )
+    parser.add_argument(
+        "--broadphase",
+        choices=("tree", "hash", "both"),
+        default="both",
+        help="Pymunk broadphase: bounding box tree, spatial hash or a comparison",
+    )
+    args = parser.parse_args()
+    counts = [int(text) for text in args.counts.split(",")]
+    kinds = SCENARIOS if args.kind == "all" else (args.kind,)
+    modes = {"tree": (False,), "hash": (True,), "both": (False, True)}[args.broadphase]
+    for kind in kinds:
+        for spatial_hash in modes:
+            reports = run(kind, counts, args.frames, args.seed, args.profile, spatial_hash)
+            for report in reports:
+                print(report.summary())
+            exponents = scaling_exponents(reports)
+            shown = " ".join(f"{name} {exponents[name]:.2f}" for name in FRAME_PASSES)
+            print(f"  exponents: {shown}")
+            for name in super_linear(exponents):
+                print(f"  warning: '{name}' grows super-linearly (N^{exponents[name]:.2f})")
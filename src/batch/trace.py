@@ -0,0 +1,207 @@
+"""Compact record of a simulated run that can be replayed by the renderer.
+
+A trace stores everything the renderer needs to draw a run without touching
+the physics engine: per-frame body states as float32 rows, crane position,
+camera transform, effect intensities, confetti and the final outcome. Frames
+of variable size are stored concatenated with an offsets array, so frame ``f``
+owns rows ``offsets[f]:offsets[f + 1]``. The per-frame crane position and
+camera transform stay in float64 since the renderer derives pixel offsets and
+zoomed sizes from them.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import numpy as np
+
+TRACE_VERSION = 1
+
+# Phases of a recorded gameplay frame
+PHASE_PLAY = 0
+PHASE_END = 1
+
+# Columns of the per-frame ``bodies`` rows
+BODY_ID, BODY_X, BODY_Y, BODY_ANGLE, BODY_VARIANT, BODY_EFFECT, BODY_ALPHA = range(7)
+BODY_COLUMNS = 7
+
+# Values stored in the ``BODY_EFFECT`` column
+EFFECT_NONE = 0
+EFFECT_IMPACT = 1
+EFFECT_GLOW = 2
+
+# Columns of the per-frame ``confetti`` rows
+CONFETTI_X, CONFETTI_Y, CONFETTI_COLOR = range(3)
+CONFETTI_COLUMNS = 3
+
+
+@dataclass
+class SimulationTrace:
+    """Recorded state of every frame of a run.
+
+    The intro sequence is not stored frame by frame since nothing moves during
+    it: ``intro_frames`` and ``intro_preview`` are enough to replay it.
+    """
+
+    seed: Optional[int]
+    sky: str
+    perfect_stack: bool
+    state: str
+    final_remaining: float
+    fps: int
+    width: int
+    height: int
+    variants: list[str]
+    intro_frames: int
+    intro_preview: int
+    audio_duration: float
+    events: list[tuple[float, str]]
+    phase: np.ndarray
+    crane_x: np.ndarray
+    preview: np.ndarray
+    remaining: np.ndarray
+    camera: np.ndarray
+    body_offsets: np.ndarray
+    bodies: np.ndarray
+    confetti_offsets: np.ndarray
+    confetti: np.ndarray
+
+    @property
+    def frame_count(self) -> int:
+        """Number of recorded gameplay and end-screen frames."""
+        return len(self.phase)
+
+    def frame_bodies(self, frame: int) -> np.ndarray:
+        """Return the body rows of ``frame``."""
+        return self.bodies[self.body_offsets[frame]:self.body_offsets[frame + 1]]
+
+    def frame_confetti(self, frame: int) -> np.ndarray:
+        """Return the confetti rows of ``frame``."""
+        return self.confetti[self.confetti_offsets[frame]:self.confetti_offsets[frame + 1]]
+
+
+@dataclass(frozen=True)
+class Outcome:
+    """How a run ends, without its frames.
+
+    ``block_count`` is the number of blocks dropped, ``despawn_count`` how
+    many of them fell off as unsupported and ``events`` the timestamped audio
+    events, as in :class:`SimulationTrace`.
+    """
+
+    seed: Optional[int]
+    sky: str
+    perfect_stack: bool
+    state: str
+    final_remaining: float
+    block_count: int
+    impact_count: int
+    despawn_count: int
+    events: list[tuple[float, str]]
+
+    def to_dict(self) -> dict:
+        """Return the outcome as JSON-serializable values."""
+        return {**asdict(self), "events": [list(event) for event in self.events]}
+
+
+@dataclass
+class TraceRecorder:
+    """Accumulate frames during a simulation and build a :class:`SimulationTrace`."""
+
+    phase: list[int] = field(default_factory=list)
+    crane_x: list[float] = field(default_factory=list)
+    preview: list[int] = field(default_factory=list)
+    remaining: list[float] = field(default_factory=list)
+    camera: list[tuple[float, float, float]] = field(default_factory=list)
+    bodies: list[np.ndarray] = field(default_factory=list)
+    confetti: list[np.ndarray] = field(default_factory=list)
+
+    def add_frame(
+        self,
+        phase: int,
+        crane_x: float,
+        preview: int,
+        remaining: float,
+        camera: tuple[float, float, float],
+        bodies: list[tuple],
+        confetti: np.ndarray,
+    ) -> None:
+        """Record one rendered frame.
+
+        ``confetti`` holds ``(x, y, color)`` rows as returned by
+        :meth:`~src.renderer.confetti.ConfettiSystem.rows`.
+        """
+        self.phase.append(phase)
+        self.crane_x.append(crane_x)
+        self.preview.append(preview)
+        self.remaining.append(remaining)
+        self.camera.append(camera)
+        self.bodies.append(np.asarray(bodies, dtype=np.float32).reshape(-1, BODY_COLUMNS))
+        self.confetti.append(np.asarray(confetti, dtype=np.float32).reshape(-1, CONFETTI_COLUMNS))
+
+    def finish(self, **meta) -> SimulationTrace:
+        """Return the trace made of the recorded frames and ``meta`` fields."""
+        return SimulationTrace(
+            phase=np.asarray(self.phase, dtype=np.int8),
+            crane_x=np.asarray(self.crane_x, dtype=np.float64),
+            preview=np.asarray(self.preview, dtype=np.int16),
+            remaining=np.asarray(self.remaining, dtype=np.float32),
+            camera=np.asarray(self.camera, dtype=np.float64).reshape(-1, 3),
+            body_offsets=_offsets(self.bodies),
+            bodies=_concat(self.bodies, BODY_COLUMNS),
+            confetti_offsets=_offsets(self.confetti),
+            confetti=_concat(self.confetti, CONFETTI_COLUMNS),
+            **meta,
+        )
+
+
+def _offsets(chunks: list[np.ndarray]) -> np.ndarray:
+    offsets = np.zeros(len(chunks) + 1, dtype=np.int32)
+    np.cumsum([len(c) for c in chunks], out=offsets[1:])
+    return offsets
+
+
+def _concat(chunks: list[np.ndarray], columns: int) -> np.ndarray:
+    if not chunks:
+        return np.zeros((0, columns), dtype=np.float32)
+    return np.concatenate(chunks).astype(np.float32, copy=False)
+
+
+_ARRAY_FIELDS = (
+    "phase",
+    "crane_x",
+    "preview",
+    "remaining",
+    "camera",
+    "body_offsets",
+    "bodies",
+    "confetti_offsets",
+    "confetti",
+)
+
+
+def save_trace(trace: SimulationTrace, path: str) -> None:
+    """Write ``trace`` to ``path`` as a compressed ``.npz`` archive."""
+    meta = {
+        name: getattr(trace, name)
+        for name in SimulationTrace.__dataclass_fields__
+        if name not in _ARRAY_FIELDS
+    }
+    meta["version"] = TRACE_VERSION
+    arrays = {name: getattr(trace, name) for name in _ARRAY_FIELDS}
+    with open(path, "wb") as fh:
+        np.savez_compressed(fh, meta=np.array(json.dumps(meta)), **arrays)
+
+
+def load_trace(path: str) -> SimulationTrace:
+    """Read a trace written by :func:`save_trace`."""
+    with np.load(path) as data:
+        meta = json.loads(str(data["meta"]))
+        arrays = {name: data[name] for name in _ARRAY_FIELDS}
+    version = meta.pop("version", None)
+    if version != TRACE_VERSION:
+        raise ValueError(f"Unsupported trace version {version!r} in {path}")
+    meta["events"] = [tuple(event) for event in meta["events"]]
+    return SimulationTrace(**meta, **arrays)
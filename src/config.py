@@ -28,6 +28,10 @@ TIME_LIMIT = 10
 # Dimensions en pixels d'un bloc (sprite et corps physique)
 BLOCK_SIZE = (150, 220)
 
+# Afficher dans la console la taille et la hitbox de chaque bloc créé
+# (débogage). Désactivé par défaut pour garder la sortie des outils lisible.
+BLOCK_DEBUG_LOGS = False
+
 # Temps qu'un bloc au repos reste sur le sol avant de disparaître s'il n'est pas
 # supporté (secondes)
 BLOCK_DESPAWN_DELAY = 4.2
@@ -55,6 +59,60 @@ BUG_SPIN_VELOCITY = 0.0
 # sert à réduire les glissements indésirables.
 BLOCK_ADHESION_FORCE = 3
 
+# Profils de simulation physique, choisis par ``PHYSICS_PROFILE`` :
+# - ``iterations`` : itérations du solveur par pas ;
+# - ``sleep_time_threshold`` : durée d'immobilité (s) avant qu'un corps ne
+#   s'endorme et ne coûte plus rien (``math.inf`` : jamais) ;
+# - ``idle_speed_threshold`` : vitesse (px/s) sous laquelle un corps est
+#   immobile (0 : valeur déduite de la gravité) ;
+# - ``collision_slop`` : chevauchement toléré entre formes (px) ;
+# - ``collision_bias`` : part du chevauchement restant après une seconde.
+# Un réglage absent garde la valeur par défaut de Pymunk.
+PHYSICS_PROFILES = {
+    # Réglages par défaut de Pymunk, sans mise en sommeil : ceux de toutes les
+    # parties générées avant l'ajout des profils.
+    # Le chevauchement et sa correction ne sont pas fixés ici : Pymunk garde
+    # ses valeurs internes, que 0.1 et 0.9 ** 60 n'égalent pas au bit près.
+    "legacy": {
+        "iterations": 10,
+        "sleep_time_threshold": math.inf,
+        "idle_speed_threshold": 0.0,
+    },
+    "preview": {
+        "iterations": 5,
+        "sleep_time_threshold": 0.3,
+        "idle_speed_threshold": 0.0,
+        "collision_slop": 0.5,
+        "collision_bias": (1 - 0.1) ** 60,
+    },
+    "production": {
+        "iterations": 10,
+        "sleep_time_threshold": 0.5,
+        "idle_speed_threshold": 0.0,
+        "collision_slop": 0.1,
+        "collision_bias": (1 - 0.1) ** 60,
+    },
+    "high-fidelity": {
+        "iterations": 30,
+        "sleep_time_threshold": math.inf,
+        "idle_speed_threshold": 0.0,
+        "collision_slop": 0.05,
+        "collision_bias": (1 - 0.1) ** 60,
+    },
+}
+# ``legacy`` garde les parties identiques à celles déjà générées ; les autres
+# profils changent l'issue de certaines graines.
+PHYSICS_PROFILE = "legacy"
+
+# Mode grandes tours : remplace la détection large de collisions de Pymunk
+# (arbre de boîtes englobantes) par une table de hachage spatiale dont les
+# cellules font la taille d'un bloc. Utile quand l'espace accumule des
+# centaines de blocs (``TIME_LIMIT`` long, disparition désactivée).
+# ``SPATIAL_HASH_COUNT`` est le nombre d'entrées de la table, idéalement
+# quelques fois le nombre de blocs.
+SPATIAL_HASH_ENABLED = False
+SPATIAL_HASH_COUNT = 1000
+
 # ---------------------------------------------------------------------------
 # Options de debug / test
 # ---------------------------------------------------------------------------
@@ -279,6 +337,21 @@ ASSET_PATHS = {
 
 OUTPUT_DIR = "output"
 
+# Cache des clips déjà générés. Un clip avec graine est identifié par un hachage
+# de ses options, de la configuration et des fichiers d'assets : s'il existe déjà
+# dans ce dossier, il est copié au lieu d'être régénéré.
+OUTPUT_CACHE_ENABLED = True
+OUTPUT_CACHE_DIR = os.path.join(OUTPUT_DIR, ".cache")
+
+# Frames d'introduction déjà rendues, une par fond, bloc affiché et style. Rien
+# ne bouge pendant l'introduction : la même frame est répétée dans la vidéo.
+INTRO_CACHE_DIR = os.path.join(OUTPUT_CACHE_DIR, "intro")
+
+# Chemins des polices système nommées dans ``INTRO_STYLES``. Les retrouver
+# oblige Pygame à parcourir toutes les polices installées : le résultat est
+# conservé dans ce fichier pour les exécutions suivantes.
+FONT_CACHE_PATH = os.path.join(OUTPUT_CACHE_DIR, "fonts.json")
+
 # ============================================================================
 # Paramètres généraux
 # ============================================================================
@@ -286,6 +359,39 @@ OUTPUT_DIR = "output"
 # Durée minimale (en secondes) d'affichage de l'écran final
 END_SCREEN_DURATION = 2
 
+# Nombre maximal de frames en attente d'encodage lors de l'export en flux.
+# La mémoire consommée reste bornée par cette file, quelle que soit la durée
+# du clip.
+STREAM_QUEUE_SIZE = 8
+
+# Options d'encodage passées à ffmpeg. ``ENCODER_THREADS = 0`` laisse ffmpeg
+# choisir le nombre de threads et ``AUDIO_BITRATE = None`` garde le débit par
+# défaut de l'encodeur audio (sinon une valeur comme ``"192k"``).
+VIDEO_CODEC = "libx264"
+X264_PRESET = "medium"
+X264_CRF = 23
+ENCODER_THREADS = 0
+AUDIO_CODEC = "aac"
+AUDIO_BITRATE = None
+
+# Nombre de frames préallouées dans lesquelles le rendu copie directement ses
+# pixels. Une frame est réécrite ce nombre de frames plus tard : il faut donc
+# au moins les ``STREAM_QUEUE_SIZE`` frames en file, celle en cours d'envoi à
+# l'encodeur et celle en cours de rendu.
+FRAME_RING_SLOTS = STREAM_QUEUE_SIZE + 2
+
+# Nombre d'emplacements de l'anneau de frames en mémoire partagée utilisé par le
+# rendu parallèle d'un clip (``render --workers``). Les workers peuvent avoir au
+# plus ce nombre de frames d'avance sur l'encodeur.
+RENDER_RING_SLOTS = 16
+
+# Cache des sprites de blocs pivotés. Les angles sont arrondis au pas indiqué
+# (en degrés) pour que les blocs presque immobiles réutilisent le même sprite,
+# et le cache est vidé des sprites les plus anciens au-delà de la taille
+# maximale (en octets).
+ROTATION_CACHE_STEP_DEG = 0.25
+ROTATION_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
 # ============================================================================
 # Paramètres audio
 # ============================================================================
@@ -307,6 +413,17 @@ SOUND_ENABLED = {
     "win_music": True,
 }
 
+# Format commun de la bande son : tous les sons sont convertis une fois à ce
+# taux d'échantillonnage et ce nombre de canaux (PCM 16 bits) avant le mixage.
+AUDIO_SAMPLE_RATE = 48000
+AUDIO_CHANNELS = 2
+
+# Banque de sons : tous les sons convertis au format commun sont rangés bout à
+# bout dans ce fichier PCM, avec un index JSON à côté (même nom, extension
+# ``.json``). Les processus le projettent en mémoire en lecture seule et
+# partagent ainsi les mêmes pages. Il est reconstruit quand les sons changent.
+SOUND_BANK_PATH = os.path.join(OUTPUT_CACHE_DIR, "sounds.pcm")
+
 # ============================================================================
 # Configuration des effets visuels (VFX)
 # ============================================================================
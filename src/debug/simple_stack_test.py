@@ -57,7 +57,9 @@ def run(output: str = os.path.join(config.OUTPUT_DIR, "stack_test.mp4"), seconds
         space.step(1 / config.FPS)
         space_builder.apply_bug_forces(space)
         space_builder.apply_adhesion_forces(space)
-        arr = pygame_renderer.render_frame(screen, space, assets, crane_x, "skyline_day.png")
+        arr = pygame_renderer.render_frame(
+            screen, space, assets, crane_x, "skyline_day.png", extract=True
+        )
         frames.append(arr)
 
     audio = AudioSegment.silent(duration=seconds * 1000)
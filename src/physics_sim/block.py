@@ -1,10 +1,14 @@
 """Creation utilities for falling blocks."""
 
-from typing import Tuple
+from typing import Optional, Tuple
 
+import numpy as np
 import pymunk
 from .. import config
 
+# Collision type of block shapes, to narrow collision handlers to blocks
+BLOCK_COLLISION_TYPE = 1
+
 
 def create_block(
     space: pymunk.Space,
@@ -14,8 +18,12 @@ def create_block(
     mass: float = 5.0,
     size: Tuple[int, int] = config.BLOCK_SIZE,
     initial_velocity: Tuple[float, float] = (0.0, 0.0),
+    registry: Optional["BlockRegistry"] = None,
 ) -> pymunk.Body:
-    """Create a dynamic block body and add it to the space."""
+    """Create a dynamic block body and add it to the space.
+
+    When ``registry`` is given the block is registered in it.
+    """
     width, height = size
     moment = pymunk.moment_for_box(mass, (width, height))
     body = pymunk.Body(mass, moment)
@@ -23,18 +31,94 @@ def create_block(
     body.velocity = initial_velocity
     shape = pymunk.Poly.create_box(body, (width, height))
 
-    # NEW: debug logs for hitbox
-    print(f"Bloc créé - Taille: {width}x{height}")
-    print(f"Vertices de la hitbox: {shape.get_vertices()}")
-    print(f"Aire de la shape: {shape.area}")
+    if config.BLOCK_DEBUG_LOGS:
+        print(f"Bloc créé - Taille: {width}x{height}")
+        print(f"Vertices de la hitbox: {shape.get_vertices()}")
+        print(f"Aire de la shape: {shape.area}")
     shape.friction = 0.7
     shape.elasticity = 0.1
     # ensure the block participates in collisions
-    shape.collision_type = 1
+    shape.collision_type = BLOCK_COLLISION_TYPE
     shape.group = 0
 
     # store variant to render the corresponding image
     body.variant = variant
 
     space.add(body, shape)
+    if registry is not None:
+        registry.add(body, variant)
     return body
+
+
+class BlockRegistry:
+    """Per-block bookkeeping of a simulation, stored in NumPy arrays.
+
+    :func:`create_block` gives every block a dense integer id, also stored as
+    ``body.block_id``, which indexes the arrays below. Ids are never reused so
+    they can identify blocks in a recorded trace; removing a block only clears
+    its slot.
+
+    ``variant`` is the index of the block texture in ``config.BLOCK_VARIANTS``,
+    ``flash`` the remaining impact flash time, ``unsupported`` how long the
+    block has been resting without support and ``flags`` a combination of the
+    ``FALLING`` and ``GLOW`` bits. ``SETTLED`` marks a block whose support was
+    checked while it slept and has not been touched since, ``KEPT`` holding
+    the result of that check.
+    """
+
+    FALLING = 1
+    GLOW = 2
+    SETTLED = 4
+    KEPT = 8
+
+    def __init__(self, capacity: int = 64) -> None:
+        self.bodies: list[pymunk.Body | None] = []
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.variant = np.full(capacity, -1, dtype=np.int16)
+        self.flash = np.zeros(capacity)
+        self.unsupported = np.zeros(capacity)
+        self.flags = np.zeros(capacity, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.bodies)
+
+    def add(self, body: pymunk.Body, variant: str) -> int:
+        """Register ``body`` and return its id."""
+        block_id = len(self.bodies)
+        if block_id == len(self.alive):
+            for name in ("alive", "variant", "flash", "unsupported", "flags"):
+                array = getattr(self, name)
+                grown = np.zeros(2 * len(array), dtype=array.dtype)
+                grown[: len(array)] = array
+                setattr(self, name, grown)
+            self.variant[block_id:] = -1
+        self.bodies.append(body)
+        self.alive[block_id] = True
+        self.variant[block_id] = (
+            config.BLOCK_VARIANTS.index(variant) if variant in config.BLOCK_VARIANTS else -1
+        )
+        body.block_id = block_id
+        return block_id
+
+    def remove(self, block_id: int) -> None:
+        """Forget the block ``block_id`` once its body has left the space."""
+        self.bodies[block_id] = None
+        self.alive[block_id] = False
+        self.flash[block_id] = 0.0
+        self.unsupported[block_id] = 0.0
+        self.flags[block_id] = 0
+
+    def ids(self) -> np.ndarray:
+        """Return the ids of the registered blocks, in creation order."""
+        return np.flatnonzero(self.alive[: len(self.bodies)])
+
+    def with_flag(self, flag: int) -> np.ndarray:
+        """Return the ids of the registered blocks having ``flag`` set."""
+        ids = self.ids()
+        return ids[(self.flags[ids] & flag) != 0]
+
+    def tick(self, dt: float) -> None:
+        """Run down every impact flash by ``dt``."""
+        flashing = self.flash > 0
+        self.flash[flashing] -= dt
+        self.flash[self.flash < 0] = 0.0
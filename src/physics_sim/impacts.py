@@ -0,0 +1,51 @@
+"""Impacts of blocks on each other and on the floor, read once per new contact."""
+
+from typing import Iterator
+
+import pymunk
+
+from .block import BLOCK_COLLISION_TYPE
+from .space_builder import FLOOR_COLLISION_TYPE
+
+
+class ImpactMonitor:
+    """Collect the contacts begun by blocks during a step, with their impulse.
+
+    Only block/block and block/floor pairs get a ``begin`` callback, so
+    resting contacts cost nothing once they have started. The impulse of a
+    contact is only known after the solver ran, so :meth:`collect` reads it
+    from the body's arbiters after :meth:`pymunk.Space.step`, once per new
+    contact. Contacts involving a sensor shape, such as a despawning block,
+    are ignored.
+    """
+
+    def __init__(self, space: pymunk.Space) -> None:
+        self._begun: list[tuple[pymunk.Shape, pymunk.Shape]] = []
+        # Pymunk 7 still runs the wildcard and default handlers, such as the
+        # one of :class:`~.tower_graph.TowerGraph`, alongside typed ones.
+        for other in (BLOCK_COLLISION_TYPE, FLOOR_COLLISION_TYPE):
+            space.on_collision(BLOCK_COLLISION_TYPE, other, begin=self._begin)
+
+    def _begin(self, arbiter, space, data) -> bool:
+        a, b = arbiter.shapes
+        if not (a.sensor or b.sensor):
+            self._begun.append((a, b))
+        return True
+
+    def collect(self) -> Iterator[tuple[tuple[pymunk.Shape, pymunk.Shape], float]]:
+        """Yield the shape pairs that started touching in the last step and their impulse.
+
+        Call it right after each step: contacts begun in earlier steps are
+        forgotten, and one that already ended yields an impulse of 0.
+        """
+        begun, self._begun = self._begun, []
+        for a, b in begun:
+            strength = 0.0
+
+            def read(arbiter) -> None:
+                nonlocal strength
+                if b in arbiter.shapes and a in arbiter.shapes:
+                    strength = arbiter.total_impulse.length
+
+            a.body.each_arbiter(read)
+            yield (a, b), strength
@@ -1,13 +1,39 @@
 """Utilities to build a Pymunk space for the simulation."""
 
-import pymunk
+import math
 import random
+
+import pymunk
 from .. import config
+from .spatial_index import BlockIndex
+
+# Collision type of the floor segment
+FLOOR_COLLISION_TYPE = 2
 
 
-def init_space() -> pymunk.Space:
-    """Initialise the physics space with gravity and a static floor."""
+def init_space(
+    profile: str | None = None,
+    spatial_hash: bool | None = None,
+    floor_width: float | None = None,
+) -> pymunk.Space:
+    """Initialise the physics space with gravity and a static floor.
+
+    ``profile`` names the solver and sleeping settings to use among
+    ``config.PHYSICS_PROFILES``, ``config.PHYSICS_PROFILE`` by default.
+    ``spatial_hash`` switches the broadphase to a spatial hash with cells the
+    size of a block, as ``config.SPATIAL_HASH_ENABLED`` does by default.
+    The floor runs from ``x=0`` to ``floor_width``, ``config.WIDTH`` by default.
+    """
+    profile = profile or config.PHYSICS_PROFILE
+    if profile not in config.PHYSICS_PROFILES:
+        raise ValueError(
+            f"Unknown physics profile '{profile}'. Valid options are: {list(config.PHYSICS_PROFILES)}"
+        )
     space = pymunk.Space()
+    for name, value in config.PHYSICS_PROFILES[profile].items():
+        setattr(space, name, value)
+    if config.SPATIAL_HASH_ENABLED if spatial_hash is None else spatial_hash:
+        space.use_spatial_hash(max(config.BLOCK_SIZE), config.SPATIAL_HASH_COUNT)
     # In Pymunk the Y axis points upward, so a negative value means gravity
     # towards the bottom of the screen.  The original code used a positive value
     # which made the blocks "fall" upwards.  We flip the sign so that the
@@ -20,47 +46,97 @@ def init_space() -> pymunk.Space:
     # properly land and stack on screen.
     floor_y = config.FLOOR_Y
     floor = pymunk.Segment(
-        space.static_body, (0, floor_y), (config.WIDTH, floor_y), 5
+        space.static_body, (0, floor_y), (floor_width or config.WIDTH, floor_y), 5
     )
     floor.friction = 1.0
+    floor.collision_type = FLOOR_COLLISION_TYPE
     space.add(floor)
     return space
 
 
-def apply_bug_forces(space: pymunk.Space) -> None:
-    """Inject random forces to create a deliberately unstable simulation."""
+def apply_bug_forces(space: pymunk.Space, rng: random.Random | None = None) -> None:
+    """Inject random forces to create a deliberately unstable simulation.
+
+    The random values are always drawn, one set per dynamic body, and only
+    their application is skipped for sleeping bodies, which stay asleep. The
+    state of ``rng`` after the call, and so every later draw of the run, is
+    then the same whether or not the profile lets bodies sleep.
+    """
     if config.BUG_SIDE_IMPULSE <= 0 and config.BUG_SPIN_VELOCITY <= 0:
         return
+    rng = rng or random
     for body in space.bodies:
         if body.body_type != pymunk.Body.DYNAMIC:
             continue
         if config.BUG_SIDE_IMPULSE > 0:
-            impulse = random.uniform(-config.BUG_SIDE_IMPULSE, config.BUG_SIDE_IMPULSE)
-            body.apply_impulse_at_local_point((impulse, 0))
+            impulse = rng.uniform(-config.BUG_SIDE_IMPULSE, config.BUG_SIDE_IMPULSE)
+            if not body.is_sleeping:
+                body.apply_impulse_at_local_point((impulse, 0))
         if config.BUG_SPIN_VELOCITY > 0:
-            body.angular_velocity += random.uniform(-config.BUG_SPIN_VELOCITY, config.BUG_SPIN_VELOCITY)
+            spin = rng.uniform(-config.BUG_SPIN_VELOCITY, config.BUG_SPIN_VELOCITY)
+            if not body.is_sleeping:
+                body.angular_velocity += spin
+
+
+def apply_adhesion_forces(space: pymunk.Space, index: BlockIndex | None = None) -> None:
+    """Attract vertically aligned blocks to reinforce stacking stability.
 
+    ``index`` is the :class:`~.spatial_index.BlockIndex` of the dynamic bodies
+    of the current frame; one is built when it is not given.
 
-def apply_adhesion_forces(space: pymunk.Space) -> None:
-    """Attract vertically aligned blocks to reinforce stacking stability."""
+    Applying a force wakes a body up and restarts its idle time, so when the
+    space lets bodies sleep, blocks that are asleep or idle by Pymunk's own
+    measure are left alone: a pair of them gets no force and in a mixed pair
+    only the moving block is pulled. A settled tower can then fall asleep.
+    """
     force = config.BLOCK_ADHESION_FORCE
     if force <= 0:
         return
 
-    dynamic = [b for b in space.bodies if b.body_type == pymunk.Body.DYNAMIC]
+    if index is None:
+        index = BlockIndex(b for b in space.bodies if b.body_type == pymunk.Body.DYNAMIC)
     width, height = config.BLOCK_SIZE
     x_thresh = width * 0.5
     y_thresh = height * 1.5
+    moving = _moving_test(space)
 
-    for i, b1 in enumerate(dynamic):
-        for b2 in dynamic[i + 1:]:
-            dx = b2.position.x - b1.position.x
-            dy = b2.position.y - b1.position.y
+    for b1 in index.bodies:
+        if not moving(b1):
+            continue
+        x, y = b1.position
+        first = index.order(b1)
+        for b2 in index.query(x - x_thresh, y - y_thresh, x + x_thresh, y + y_thresh):
+            awake = moving(b2)
+            # Pairs of moving blocks are handled once, from their first block
+            if b2 is b1 or (awake and index.order(b2) <= first):
+                continue
+            dx = b2.position.x - x
+            dy = b2.position.y - y
             if abs(dx) > x_thresh:
                 continue
             if 0 < dy <= y_thresh:
                 b1.apply_force_at_local_point((0, force))
-                b2.apply_force_at_local_point((0, -force))
+                if awake:
+                    b2.apply_force_at_local_point((0, -force))
             elif -y_thresh <= dy < 0:
                 b1.apply_force_at_local_point((0, -force))
-                b2.apply_force_at_local_point((0, force))
+                if awake:
+                    b2.apply_force_at_local_point((0, force))
+
+
+def _moving_test(space: pymunk.Space):
+    """Return a test telling whether a body is neither asleep nor idle.
+
+    Idle follows Chipmunk: the kinetic energy is below that of the body moving
+    at ``idle_speed_threshold``, which defaults to the speed gravity gives in
+    one frame. Without sleeping every body counts as moving.
+    """
+    if math.isinf(space.sleep_time_threshold):
+        return lambda body: True
+    idle_speed = space.idle_speed_threshold or space.gravity.length / config.FPS
+    idle_sq = idle_speed * idle_speed
+
+    def moving(body: pymunk.Body) -> bool:
+        return not body.is_sleeping and body.kinetic_energy >= idle_sq * body.mass
+
+    return moving
@@ -0,0 +1,63 @@
+"""Uniform grid over the blocks of one simulation frame."""
+
+import math
+from collections import defaultdict
+from typing import Iterable
+
+import pymunk
+
+from .. import config
+
+
+class BlockIndex:
+    """Bounding boxes of a set of bodies, bucketed in a grid of square cells.
+
+    The index is a snapshot: it is built once per frame after the physics step
+    and is valid until the bodies move again. Each body's bounding box is read
+    a single time, and :meth:`query` only looks at the cells a box overlaps,
+    so neighbor searches cost the number of nearby blocks instead of the
+    number of blocks in the space. Cells default to the larger side of
+    ``config.BLOCK_SIZE``.
+    """
+
+    def __init__(self, bodies: Iterable[pymunk.Body], cell_size: float | None = None) -> None:
+        self.cell_size = cell_size or max(config.BLOCK_SIZE)
+        self.bodies: list[pymunk.Body] = []
+        self._bbs: dict[pymunk.Body, pymunk.BB] = {}
+        self._order: dict[pymunk.Body, int] = {}
+        self._cells: defaultdict[tuple[int, int], list[pymunk.Body]] = defaultdict(list)
+        for body in bodies:
+            bb = next(iter(body.shapes)).bb
+            self._order[body] = len(self.bodies)
+            self.bodies.append(body)
+            self._bbs[body] = bb
+            for cell in self._cells_of(bb.left, bb.bottom, bb.right, bb.top):
+                self._cells[cell].append(body)
+
+    def _cells_of(self, left: float, bottom: float, right: float, top: float):
+        size = self.cell_size
+        for cx in range(math.floor(left / size), math.floor(right / size) + 1):
+            for cy in range(math.floor(bottom / size), math.floor(top / size) + 1):
+                yield cx, cy
+
+    def bb(self, body: pymunk.Body) -> pymunk.BB:
+        """Return the bounding box ``body`` had when the index was built."""
+        return self._bbs[body]
+
+    def query(self, left: float, bottom: float, right: float, top: float) -> list[pymunk.Body]:
+        """Return the bodies whose bounding box may touch the given box.
+
+        Every body whose box intersects it is returned, along with a few
+        neighbors sharing its cells, so callers apply their exact test on the
+        result. Bodies come back once each, in the order they were indexed.
+        """
+        found: set[pymunk.Body] = set()
+        for cell in self._cells_of(left, bottom, right, top):
+            bodies = self._cells.get(cell)
+            if bodies:
+                found.update(bodies)
+        return sorted(found, key=self._order.__getitem__)
+
+    def order(self, body: pymunk.Body) -> int:
+        """Return the position of ``body`` in :attr:`bodies`."""
+        return self._order[body]
@@ -0,0 +1,187 @@
+"""Contact graph of the blocks, maintained from Pymunk collision callbacks."""
+
+from collections import deque
+from typing import Iterable, Optional
+
+import pymunk
+
+from .. import config
+
+
+class TowerGraph:
+    """Which blocks touch each other and the floor, as reported by Pymunk.
+
+    Edges are added by the ``begin`` callback and removed by ``separate``,
+    which Pymunk also calls when a shape in contact is removed from the space.
+    Contacts involving a sensor shape are ignored, so a block turned into a
+    sensor to despawn leaves the graph once its current contacts end; call
+    :meth:`discard` to drop it immediately. Unlike bounding box tests, the
+    graph is exact for tilted blocks.
+
+    The set of blocks resting on the floor, directly or through other blocks,
+    is kept up to date as contacts change: a new contact grounds the blocks it
+    connects to the floor, and a lost contact only searches the component of
+    the blocks it separated, stopping as soon as one touches the floor.
+    The blocks whose contacts changed are also remembered until
+    :meth:`pop_changed` is called.
+    """
+
+    def __init__(self, space: pymunk.Space) -> None:
+        self._contacts: dict[pymunk.Body, dict[pymunk.Body, int]] = {}
+        self._floor: dict[pymunk.Body, int] = {}
+        # Shape pairs counted by ``_begin``, with the bodies they linked
+        self._pairs: dict[frozenset, tuple[pymunk.Body, pymunk.Body | None]] = {}
+        self._grounded: set[pymunk.Body] = set()
+        self._changed: set[pymunk.Body] = set()
+        space.on_collision(begin=self._begin, separate=self._separate)
+
+    def _begin(self, arbiter, space, data) -> bool:
+        a, b = arbiter.shapes
+        if a.sensor or b.sensor:
+            return True
+        dynamic = [
+            shape.body for shape in (a, b) if shape.body.body_type == pymunk.Body.DYNAMIC
+        ]
+        if len(dynamic) == 2:
+            link = (dynamic[0], dynamic[1])
+        elif dynamic:
+            link = (dynamic[0], None)
+        else:
+            return True
+        self._pairs[frozenset((a, b))] = link
+        self._link(*link, 1)
+        return True
+
+    def _separate(self, arbiter, space, data) -> None:
+        link = self._pairs.pop(frozenset(arbiter.shapes), None)
+        if link is not None:
+            self._link(*link, -1)
+
+    def _link(self, body: pymunk.Body, other: pymunk.Body | None, delta: int) -> None:
+        """Add ``delta`` contacts between ``body`` and ``other``, or the floor."""
+        self._changed.add(body)
+        if other is None:
+            before = body in self._floor
+            _bump(self._floor, body, delta)
+            if body in self._floor and not before:
+                self._ground_from(body)
+            elif before and body not in self._floor:
+                self._recheck(body)
+            return
+        self._changed.add(other)
+        before = other in self._contacts.get(body, ())
+        _bump(self._contacts.setdefault(body, {}), other, delta)
+        _bump(self._contacts.setdefault(other, {}), body, delta)
+        for one in (body, other):
+            if not self._contacts[one]:
+                del self._contacts[one]
+        after = other in self._contacts.get(body, ())
+        if after and not before:
+            if body in self._grounded and other not in self._grounded:
+                self._ground_from(other)
+            elif other in self._grounded and body not in self._grounded:
+                self._ground_from(body)
+        elif before and not after:
+            self._recheck(body)
+            self._recheck(other)
+
+    def _ground_from(self, start: pymunk.Body) -> None:
+        """Mark ``start`` and the ungrounded blocks reachable from it as grounded."""
+        if start in self._grounded:
+            return
+        self._grounded.add(start)
+        queue = deque([start])
+        while queue:
+            for other in self.neighbors(queue.popleft()):
+                if other not in self._grounded:
+                    self._grounded.add(other)
+                    queue.append(other)
+
+    def _recheck(self, start: pymunk.Body) -> None:
+        """Unground the component of ``start`` unless one of its blocks touches the floor."""
+        if start not in self._grounded:
+            return
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            body = queue.popleft()
+            if body in self._floor:
+                return
+            for other in self.neighbors(body):
+                if other not in seen:
+                    seen.add(other)
+                    queue.append(other)
+        self._grounded -= seen
+
+    def discard(self, body: pymunk.Body) -> None:
+        """Forget every contact of ``body``."""
+        for pair, link in list(self._pairs.items()):
+            if body in link:
+                del self._pairs[pair]
+                self._link(*link, -1)
+
+    def pop_changed(self) -> set[pymunk.Body]:
+        """Return the blocks whose contacts changed since the last call."""
+        changed, self._changed = self._changed, set()
+        return changed
+
+    def neighbors(self, body: pymunk.Body) -> Iterable[pymunk.Body]:
+        """Return the blocks ``body`` is touching."""
+        return self._contacts.get(body, {}).keys()
+
+    def touches_floor(self, body: pymunk.Body) -> bool:
+        """Return whether ``body`` is in contact with the floor."""
+        return body in self._floor
+
+    def has_block_on_top(self, body: pymunk.Body) -> bool:
+        """Return whether a block touching ``body`` sits above it.
+
+        A neighbor is above when its center is more than half a block higher,
+        which tells a block resting on ``body`` from one leaning on its side.
+        """
+        limit = body.position.y + config.BLOCK_SIZE[1] / 2
+        return any(other.position.y > limit for other in self.neighbors(body))
+
+    def is_supported(self, body: pymunk.Body) -> bool:
+        """Return whether ``body`` rests on the floor, directly or through blocks."""
+        return body in self._grounded
+
+    def max_height(self, bodies: Iterable[pymunk.Body]) -> Optional[float]:
+        """Return the height of the top of the supported blocks among ``bodies``.
+
+        A block's top is its center plus half of ``config.BLOCK_SIZE``'s
+        height, whatever its angle. ``None`` means none of them is supported.
+        """
+        half = config.BLOCK_SIZE[1] / 2
+        tops = [
+            body.position.y + half
+            for body in bodies
+            if self.is_supported(body)
+        ]
+        return max(tops, default=None)
+
+    def connected_tower(self, y: float, bodies: Iterable[pymunk.Body]) -> set[pymunk.Body]:
+        """Return the blocks of ``bodies`` touching, through each other, one reaching ``y``.
+
+        Only supported blocks whose highest point is at least ``y`` start the
+        search and only blocks of ``bodies`` are followed.
+        """
+        candidates = set(bodies)
+        tower = {
+            body
+            for body in candidates
+            if self.is_supported(body) and next(iter(body.shapes)).bb.top >= y
+        }
+        queue = deque(tower)
+        while queue:
+            for other in self.neighbors(queue.popleft()):
+                if other in candidates and other not in tower:
+                    tower.add(other)
+                    queue.append(other)
+        return tower
+
+
+def _bump(counts: dict, key, delta: int) -> None:
+    counts[key] = counts.get(key, 0) + delta
+    if not counts[key]:
+        del counts[key]
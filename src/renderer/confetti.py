@@ -0,0 +1,72 @@
+"""Confetti particles of the victory screen, simulated without pygame."""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+
+from .. import config
+
+
+class ConfettiSystem:
+    """Confetti particles stored as one NumPy array per attribute.
+
+    Particle ``i`` is ``x[i]``, ``y[i]``, ``vx[i]``, ``vy[i]``, ``life[i]`` and
+    ``color[i]``, an index into ``config.CONFETTI_COLORS``. Particles keep
+    their spawn order so that later ones are drawn on top.
+    """
+
+    def __init__(self) -> None:
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.vx = np.zeros(0)
+        self.vy = np.zeros(0)
+        self.life = np.zeros(0)
+        self.color = np.zeros(0, dtype=np.int16)
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def spawn(self, count: int, y_pos: float, rng: random.Random | None = None) -> None:
+        """Add ``count`` particles launched upwards from height ``y_pos``.
+
+        ``rng`` is drawn from in the same order for every particle, so a
+        seeded generator always gives the same burst.
+        """
+        rng = rng or random
+        colors = range(len(config.CONFETTI_COLORS))
+        new = np.empty((count, 4))
+        color = np.empty(count, dtype=np.int16)
+        for i in range(count):
+            vx = rng.uniform(-150, 150)
+            vy = rng.uniform(-250, -50)
+            new[i] = (rng.uniform(0, config.WIDTH), vx, vy, config.CONFETTI_LIFETIME)
+            color[i] = rng.choice(colors)
+        self.x = np.concatenate((self.x, new[:, 0]))
+        self.y = np.concatenate((self.y, np.full(count, float(y_pos))))
+        self.vx = np.concatenate((self.vx, new[:, 1]))
+        self.vy = np.concatenate((self.vy, new[:, 2]))
+        self.life = np.concatenate((self.life, new[:, 3]))
+        self.color = np.concatenate((self.color, color))
+
+    def update(self, dt: float) -> None:
+        """Advance every particle by ``dt`` and drop the expired ones."""
+        if not len(self):
+            return
+        self.vy += config.CONFETTI_GRAVITY * dt
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        self.life -= dt
+        alive = (self.life > 0) & (self.y <= config.HEIGHT + 20)
+        if not alive.all():
+            self.x = self.x[alive]
+            self.y = self.y[alive]
+            self.vx = self.vx[alive]
+            self.vy = self.vy[alive]
+            self.life = self.life[alive]
+            self.color = self.color[alive]
+
+    def rows(self) -> np.ndarray:
+        """Return the particles as ``(x, y, color)`` rows, as stored in traces."""
+        return np.column_stack((self.x, self.y, self.color))
@@ -1,5 +1,7 @@
 """Helpers for drawing text overlays."""
 
+import json
+import os
 import pygame
 import math
 import random
@@ -10,6 +12,78 @@ from .. import config
 pygame.font.init()
 
 
+# Files of the system fonts already looked up, by name. ``None`` means the font
+# is not installed and pygame's default font stands in for it.
+_FONT_PATHS: dict[str, str | None] | None = None
+# Font objects built by ``get_font``, by ``(name, size, bold)``
+_FONTS: dict[tuple, pygame.font.Font] = {}
+
+
+def _load_font_paths() -> dict[str, str | None]:
+    if not config.OUTPUT_CACHE_ENABLED:
+        return {}
+    try:
+        with open(config.FONT_CACHE_PATH, encoding="utf-8") as fh:
+            paths = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    # Fonts uninstalled since the file was written are looked up again.
+    return {
+        name: path
+        for name, path in paths.items()
+        if path is None or os.path.exists(path)
+    }
+
+
+def _save_font_paths(paths: dict[str, str | None]) -> None:
+    if not config.OUTPUT_CACHE_ENABLED:
+        return
+    os.makedirs(os.path.dirname(config.FONT_CACHE_PATH), exist_ok=True)
+    tmp = f"{config.FONT_CACHE_PATH}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(paths, fh, indent=2, sort_keys=True)
+    os.replace(tmp, config.FONT_CACHE_PATH)
+
+
+def font_path(name: str) -> str | None:
+    """Return the file of system font ``name``, or ``None`` if it is missing.
+
+    Finding a system font makes pygame scan every installed font, so the first
+    lookup resolves all the fonts named in ``config.INTRO_STYLES`` at once and
+    saves them in ``config.FONT_CACHE_PATH`` for later processes.
+    """
+    global _FONT_PATHS
+    if _FONT_PATHS is None:
+        _FONT_PATHS = _load_font_paths()
+    if name not in _FONT_PATHS:
+        names = {name}
+        names.update(
+            style["font_name"]
+            for style in config.INTRO_STYLES.values()
+            if style.get("font_name")
+        )
+        for missing in names - _FONT_PATHS.keys():
+            _FONT_PATHS[missing] = pygame.font.match_font(missing)
+        _save_font_paths(_FONT_PATHS)
+    return _FONT_PATHS[name]
+
+
+def get_font(name: str | None, size: int, bold: bool = True) -> pygame.font.Font:
+    """Return the font ``name`` at ``size``, built once per process.
+
+    ``name`` is a system font name as accepted by ``pygame.font.SysFont``, or
+    ``None`` for pygame's default font. The returned font is shared and its
+    style must not be changed.
+    """
+    key = (name, size, bold)
+    font = _FONTS.get(key)
+    if font is None:
+        font = pygame.font.Font(font_path(name) if name else None, size)
+        font.set_bold(bold)
+        _FONTS[key] = font
+    return font
+
+
 def render_flat_text(
     surface: pygame.Surface,
     text: str,
@@ -96,9 +170,15 @@ def render_vintage_text(
     offset: tuple[int, int],
     outline_color: tuple[int, int, int] = config.TEXT_OUTLINE_COLOR,
     outline_width: int = config.TEXT_OUTLINE_WIDTH,
+    rng: random.Random | None = None,
 ) -> None:
-    """Render text with a vintage look (soft shadow and slight grain)."""
+    """Render text with a vintage look (soft shadow and slight grain).
+
+    ``rng`` places the grain; a seeded generator gives the same grain on
+    every call.
+    """
 
+    rng = rng or random
     x, y = pos
     dx, dy = offset
 
@@ -130,9 +210,9 @@ def render_vintage_text(
     # Add optional light grain
     noise = pygame.Surface((w, h), pygame.SRCALPHA)
     for _ in range(w * h // 50):
-        nx = random.randint(0, w - 1)
-        ny = random.randint(0, h - 1)
-        alpha = random.randint(10, 30)
+        nx = rng.randint(0, w - 1)
+        ny = rng.randint(0, h - 1)
+        alpha = rng.randint(10, 30)
         noise.set_at((nx, ny), (0, 0, 0, alpha))
     base.blit(noise, (0, 0), special_flags=pygame.BLEND_RGBA_SUB)
 
@@ -149,11 +229,17 @@ def render_vintage_text(
     surface.blit(base, (x, y))
 
 
-def draw_intro(surface: pygame.Surface, text: str | None = None, style_name: str | None = None) -> None:
+def draw_intro(
+    surface: pygame.Surface,
+    text: str | None = None,
+    style_name: str | None = None,
+    rng: random.Random | None = None,
+) -> None:
     """Draw the intro text using the style defined in :mod:`config`.
 
     ``style_name`` can be one of the keys defined in ``config.INTRO_STYLES`` to
-    pick an alternate appearance.
+    pick an alternate appearance. ``rng`` drives the grain of the vintage
+    style.
     """
     if text is None:
         text = config.INTRO_TEXT
@@ -161,12 +247,7 @@ def draw_intro(surface: pygame.Surface, text: str | None = None, style_name: str
         style = config.INTRO_STYLES.get(style_name, config.INTRO_STYLE)
     else:
         style = config.INTRO_STYLE
-    font_name = style.get("font_name")
-    if font_name:
-        font = pygame.font.SysFont(font_name, style.get("font_size", 72))
-    else:
-        font = pygame.font.Font(None, style.get("font_size", 72))
-    font.set_bold(True)
+    font = get_font(style.get("font_name"), style.get("font_size", 72))
     palette = config.PALETTES.get(style.get("palette", "default"), {})
     text_color = palette.get("text", (255, 255, 255))
     shadow_color = palette.get("shadow", (0, 0, 0))
@@ -201,6 +282,7 @@ def draw_intro(surface: pygame.Surface, text: str | None = None, style_name: str
             (dx, dy),
             outline_color,
             outline_width,
+            rng=rng,
         )
     else:
         render_flat_text(
@@ -216,25 +298,60 @@ def draw_intro(surface: pygame.Surface, text: str | None = None, style_name: str
         )
 
 
-def _draw_centered(surface: pygame.Surface, text: str, color, size: int = 96) -> None:
-    """Helper to draw centered bold text with a drop shadow."""
-    font = pygame.font.Font(None, size)
-    font.set_bold(True)
+# Blit passes of the text overlays already rendered by ``_text_overlay``
+_OVERLAY_CACHE: dict[tuple, tuple[list[tuple[pygame.Surface, tuple[int, int]]], tuple[int, int]]] = {}
+
+
+def _text_overlay(
+    text: str,
+    color: tuple[int, int, int],
+    size: int,
+    shadow_offset: tuple[int, int] = (2, 2),
+) -> tuple[list[tuple[pygame.Surface, tuple[int, int]]], tuple[int, int]]:
+    """Return the passes drawing bold text with its drop shadow and outline.
+
+    Each pass is a rendered surface and its offset from the text position, in
+    blit order, and they are returned with the size of the text itself. The
+    surfaces are kept by text, colors, font size and outline so that an
+    overlay shown on many frames is never rendered again. The passes are still
+    blitted one by one onto the frame, which blends antialiased edges exactly
+    like drawing the text from scratch.
+    """
+    shadow_color = config.PALETTES["default"]["shadow"]
+    outline_color = config.TEXT_OUTLINE_COLOR
+    outline_width = config.TEXT_OUTLINE_WIDTH
+    key = (text, tuple(color), size, shadow_offset, shadow_color, outline_color, outline_width)
+    cached = _OVERLAY_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    font = get_font(None, size)
     rendered = font.render(text, True, color)
-    shadow = font.render(text, True, config.PALETTES["default"]["shadow"])
-    x = (config.WIDTH - rendered.get_width()) // 2
-    y = (config.HEIGHT - rendered.get_height()) // 2
-    surface.blit(shadow, (x + 2, y + 2))
-    if config.TEXT_OUTLINE_WIDTH > 0:
-        outline = font.render(text, True, config.TEXT_OUTLINE_COLOR)
-        for ox in range(-config.TEXT_OUTLINE_WIDTH, config.TEXT_OUTLINE_WIDTH + 1):
-            for oy in range(-config.TEXT_OUTLINE_WIDTH, config.TEXT_OUTLINE_WIDTH + 1):
+    passes = [(font.render(text, True, shadow_color), shadow_offset)]
+    if outline_width > 0:
+        outline = font.render(text, True, outline_color)
+        for ox in range(-outline_width, outline_width + 1):
+            for oy in range(-outline_width, outline_width + 1):
                 if ox == 0 and oy == 0:
                     continue
-                if ox * ox + oy * oy > config.TEXT_OUTLINE_WIDTH * config.TEXT_OUTLINE_WIDTH:
+                if ox * ox + oy * oy > outline_width * outline_width:
                     continue
-                surface.blit(outline, (x + ox, y + oy))
-    surface.blit(rendered, (x, y))
+                passes.append((outline, (ox, oy)))
+    passes.append((rendered, (0, 0)))
+    cached = (passes, rendered.get_size())
+    _OVERLAY_CACHE[key] = cached
+    return cached
+
+
+def _blit_passes(surface: pygame.Surface, passes, pos: tuple[int, int]) -> None:
+    x, y = pos
+    surface.blits([(layer, (x + ox, y + oy)) for layer, (ox, oy) in passes], doreturn=False)
+
+
+def _draw_centered(surface: pygame.Surface, text: str, color, size: int = 96) -> None:
+    """Helper to draw centered bold text with a drop shadow."""
+    passes, (w, h) = _text_overlay(text, color, size)
+    _blit_passes(surface, passes, ((config.WIDTH - w) // 2, (config.HEIGHT - h) // 2))
 
 
 def draw_victory(surface: pygame.Surface) -> None:
@@ -252,20 +369,5 @@ def draw_timer(surface: pygame.Surface, remaining: float) -> None:
 
     secs = max(0, math.ceil(remaining))
     color = (255, 0, 0) if secs <= 10 else config.PALETTES["default"]["text"]
-    font = pygame.font.Font(None, 120)
-    font.set_bold(True)
-    text = str(secs)
-    rendered = font.render(text, True, color)
-    shadow = font.render(text, True, config.PALETTES["default"]["shadow"])
-    surface.blit(shadow, (12, 12))
-    if config.TEXT_OUTLINE_WIDTH > 0:
-        outline = font.render(text, True, config.TEXT_OUTLINE_COLOR)
-        for ox in range(-config.TEXT_OUTLINE_WIDTH, config.TEXT_OUTLINE_WIDTH + 1):
-            for oy in range(-config.TEXT_OUTLINE_WIDTH, config.TEXT_OUTLINE_WIDTH + 1):
-                if ox == 0 and oy == 0:
-                    continue
-                if ox * ox + oy * oy > config.TEXT_OUTLINE_WIDTH * config.TEXT_OUTLINE_WIDTH:
-                    continue
-                surface.blit(outline, (10 + ox, 10 + oy))
-    surface.blit(rendered, (10, 10))
-
+    passes, _ = _text_overlay(str(secs), color, 120)
+    _blit_passes(surface, passes, (10, 10))
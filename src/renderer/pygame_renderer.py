@@ -1,6 +1,7 @@
 """Headless Pygame renderer for the challenge."""
 
-from typing import Dict, Optional
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
 import math
 import os
 
@@ -11,13 +12,12 @@ import pymunk
 from .. import config
 
 os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+# Leave SIGTERM to Python so that pools of render workers can be terminated.
+os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
 pygame.init()
 pygame.display.set_mode((1, 1))
 
 
-_DEF_FONT = None
-
-
 def load_assets() -> Dict[str, pygame.Surface]:
     """Load image assets into a dictionary."""
     assets = {}
@@ -43,12 +43,141 @@ def load_assets() -> Dict[str, pygame.Surface]:
     return assets
 
 
+def static_background(assets, sky_name: str) -> pygame.Surface:
+    """Return the sky with the crane bar baked in, built once per sky.
+
+    These layers never change during a clip, so they are composed a single
+    time in the display pixel format and kept in ``assets["background"]``.
+    """
+    backgrounds = assets.setdefault("background", {})
+    background = backgrounds.get(sky_name)
+    if background is None:
+        background = assets["sky"][sky_name].convert()
+        bar_img = assets["crane_bar"]
+        if bar_img.get_width() != config.WIDTH:
+            bar_img = pygame.transform.scale(bar_img, (config.WIDTH, bar_img.get_height()))
+        background.blit(bar_img, (0, config.CRANE_BAR_Y))
+        backgrounds[sky_name] = background
+    return background
+
+
 def rotate_surface(img: pygame.Surface, angle_rad: float) -> pygame.Surface:
     """Return a new surface rotated to match the given body angle."""
     angle_deg = -math.degrees(angle_rad)
     return pygame.transform.rotate(img, angle_deg)
 
 
+class RotationCache:
+    """LRU cache of rotated block sprites keyed by variant and quantized angle.
+
+    Angles are rounded to ``step_deg`` degrees; an angle that rounds to zero
+    returns the unrotated sprite itself. Least recently used sprites are
+    evicted once the cached pixels exceed ``max_bytes``. Returned surfaces are
+    shared and must not be drawn on.
+    """
+
+    def __init__(
+        self,
+        step_deg: float = config.ROTATION_CACHE_STEP_DEG,
+        max_bytes: int = config.ROTATION_CACHE_MAX_BYTES,
+    ) -> None:
+        self.step_deg = step_deg
+        self.max_bytes = max_bytes
+        self._steps_per_turn = round(360 / step_deg)
+        self._entries: OrderedDict = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.unrotated = 0
+
+    def get(self, variant: str, base_img: pygame.Surface, angle_rad: float) -> pygame.Surface:
+        """Return ``base_img`` rotated by ``angle_rad`` up to the angular step."""
+        steps = round(-math.degrees(angle_rad) / self.step_deg) % self._steps_per_turn
+        if steps == 0:
+            self.unrotated += 1
+            return base_img
+        key = (variant, steps)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is base_img:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        rotated = pygame.transform.rotate(base_img, steps * self.step_deg)
+        if entry is not None:
+            self.size_bytes -= _surface_bytes(entry[1])
+        self._entries[key] = (base_img, rotated)
+        self._entries.move_to_end(key)
+        self.size_bytes += _surface_bytes(rotated)
+        while self.size_bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.size_bytes -= _surface_bytes(evicted)
+        return rotated
+
+    def stats(self) -> dict:
+        """Return lookup counters and the current size of the cache."""
+        lookups = self.hits + self.misses + self.unrotated
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "unrotated": self.unrotated,
+            "hit_rate": (self.hits + self.unrotated) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self.size_bytes,
+        }
+
+
+def _surface_bytes(surface: pygame.Surface) -> int:
+    width, height = surface.get_size()
+    return width * height * surface.get_bytesize()
+
+
+_ROTATION_CACHE = RotationCache()
+
+
+def rotation_cache_stats() -> dict:
+    """Return the statistics of the rotated-sprite cache used for blocks."""
+    return _ROTATION_CACHE.stats()
+
+
+def grab_frame(surface: pygame.Surface, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Copy the pixels of ``surface`` into an ``(height, width, 3)`` array.
+
+    ``out`` is the C-contiguous uint8 array to fill, typically a slot of a
+    :class:`FrameRing`; a new one is allocated when it is omitted. The pixels
+    are copied once, straight from the surface memory.
+    """
+    width, height = surface.get_size()
+    if out is None:
+        out = np.empty((height, width, 3), dtype=np.uint8)
+    pixels = pygame.surfarray.pixels3d(surface)
+    try:
+        out[...] = pixels.transpose(1, 0, 2)
+    finally:
+        del pixels
+    return out
+
+
+class FrameRing:
+    """Preallocated frames handed out in turn to receive rendered pixels.
+
+    The buffer is one C-contiguous ``(slots, height, width, 3)`` uint8 array.
+    A frame returned by :meth:`next` is overwritten ``slots`` calls later, so
+    its consumer must be done with it by then.
+    """
+
+    def __init__(self, size: Tuple[int, int], slots: int = config.FRAME_RING_SLOTS) -> None:
+        width, height = size
+        self.frames = np.zeros((slots, height, width, 3), dtype=np.uint8)
+        self._next = 0
+
+    def next(self) -> np.ndarray:
+        """Return the frame to fill next."""
+        frame = self.frames[self._next]
+        self._next = (self._next + 1) % len(self.frames)
+        return frame
+
+
 def render_frame(
     surface: pygame.Surface,
     space,
@@ -57,22 +186,60 @@ def render_frame(
     sky_name: str,
     preview_variant: str | None = None,
     block_effects: Optional[dict] | None = None,
-    confetti: Optional[list] | None = None,
-) -> np.ndarray:
-    """Render a single frame and return it as a numpy array.
+    confetti=None,
+    extract: bool = False,
+    out: Optional[np.ndarray] = None,
+) -> Optional[np.ndarray]:
+    """Render a single frame onto ``surface``.
 
     ``preview_variant`` optionally specifies the block variant currently hanging
     from the crane hook ready to be dropped. When provided, the corresponding
     sprite is drawn beneath the hook so the upcoming block is visible to the
-    viewer.
+    viewer. ``confetti`` is an optional :class:`~.confetti.ConfettiSystem`.
+
+    The frame is only copied out of ``surface`` when asked: with ``extract``
+    or an ``out`` array it is returned by :func:`grab_frame`, otherwise
+    ``None`` is returned.
     """
     block_effects = block_effects or {}
-    confetti = confetti or []
-    surface.blit(assets["sky"][sky_name], (0, 0))
-    bar_img = assets["crane_bar"]
-    if bar_img.get_width() != config.WIDTH:
-        bar_img = pygame.transform.scale(bar_img, (config.WIDTH, bar_img.get_height()))
-    surface.blit(bar_img, (0, config.CRANE_BAR_Y))
+    bodies = []
+    for body in space.bodies:
+        if isinstance(body, pymunk.Body) and body.body_type != pymunk.Body.DYNAMIC:
+            continue
+        x, y = body.position
+        bodies.append((getattr(body, "variant", None), x, y, body.angle, block_effects.get(body)))
+    render_state(
+        surface,
+        assets,
+        crane_x,
+        sky_name,
+        preview_variant,
+        bodies,
+        confetti.rows() if confetti is not None else (),
+    )
+    if not extract and out is None:
+        return None
+    return grab_frame(surface, out)
+
+
+def render_state(
+    surface: pygame.Surface,
+    assets,
+    crane_x: float,
+    sky_name: str,
+    preview_variant: str | None,
+    bodies,
+    confetti=(),
+) -> None:
+    """Draw a frame from plain state values instead of a live space.
+
+    ``bodies`` yields ``(variant, x, y, angle, effect)`` tuples in physics
+    coordinates where ``effect`` is ``None`` or a ``(color, alpha)`` pair, and
+    ``confetti`` holds ``(x, y, color)`` rows in screen coordinates with
+    ``color`` an index into ``config.CONFETTI_COLORS``. This is what replaying
+    a recorded trace uses.
+    """
+    surface.blit(static_background(assets, sky_name), (0, 0))
 
     hook_img = assets["hook"]
     hook_y = config.CRANE_BAR_Y + config.HOOK_Y_OFFSET
@@ -84,50 +251,65 @@ def render_frame(
         preview_x = crane_x - preview_img.get_width() // 2
         preview_y = config.PREVIEW_HEIGHT - preview_img.get_height() // 2
         surface.blit(preview_img, (preview_x, preview_y))
-    for body in space.bodies:
-        if isinstance(body, pymunk.Body) and body.body_type != pymunk.Body.DYNAMIC:
-            continue
-
-
-        variant = getattr(body, "variant", None)
+    for variant, x, y, angle, effect in bodies:
         if variant and variant in assets["blocks"]:
             base_img = assets["blocks"][variant]
-            img = rotate_surface(base_img, body.angle)
-            effect = block_effects.get(body)
+            img = _ROTATION_CACHE.get(variant, base_img, angle)
             if effect:
+                # Cached sprites are shared, tint a copy.
+                img = img.copy()
                 color, alpha = effect
                 overlay = pygame.Surface(img.get_size(), pygame.SRCALPHA)
                 overlay.fill((*color, alpha))
                 img.blit(overlay, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
-            x, y = body.position
             py_y = config.HEIGHT - int(y)
             rect = img.get_rect(center=(int(x), py_y))
             surface.blit(img, rect)
 
-    if confetti:
+    if len(confetti):
         from . import vfx
         vfx.draw_confetti(surface, confetti)
 
-    arr = pygame.surfarray.array3d(surface)
-    return np.transpose(arr, (1, 0, 2))
 
+def apply_camera(
+    surface: pygame.Surface,
+    offset=(0.0, 0.0),
+    zoom: float = 1.0,
+    out: Optional[pygame.Surface] = None,
+) -> pygame.Surface:
+    """Return ``surface`` seen through the camera.
 
-def apply_camera(surface: pygame.Surface, offset=(0.0, 0.0), zoom: float = 1.0) -> pygame.Surface:
-    """Return a new surface with the camera transform applied."""
+    Without offset or zoom ``surface`` itself is returned. Otherwise the view
+    is drawn into ``out``, a surface of the same size reused across frames,
+    or a new one when it is omitted: a shake is a single offset blit, and a
+    zoom only scales the part of ``surface`` that stays visible. Areas the
+    view does not cover are black.
+    """
     if not config.CAMERA_EFFECTS_ENABLED or (offset == (0.0, 0.0) and zoom == 1.0):
-        return surface.copy()
-
-    if zoom != 1.0:
-        w = int(config.WIDTH * zoom)
-        h = int(config.HEIGHT * zoom)
-        transformed = pygame.transform.smoothscale(surface, (w, h))
-    else:
-        transformed = surface.copy()
-    result = pygame.Surface((config.WIDTH, config.HEIGHT))
-    rect = transformed.get_rect()
-    rect.center = (
-        config.WIDTH // 2 + int(offset[0]),
-        config.HEIGHT // 2 + int(offset[1]),
-    )
-    result.blit(transformed, rect)
-    return result
+        return surface
+
+    width, height = surface.get_size()
+    if out is None:
+        out = pygame.Surface((width, height))
+    w = int(width * zoom) if zoom != 1.0 else width
+    h = int(height * zoom) if zoom != 1.0 else height
+    rect = pygame.Rect(0, 0, w, h)
+    rect.center = (width // 2 + int(offset[0]), height // 2 + int(offset[1]))
+    visible = rect.clip(out.get_rect())
+    if visible.size != (width, height):
+        out.fill((0, 0, 0))
+    if not visible.width or not visible.height:
+        return out
+    if (w, h) == (width, height):
+        out.blit(surface, rect)
+        return out
+
+    # Source pixels behind the visible area, widened to whole pixels
+    scale_x, scale_y = w / width, h / height
+    left = math.floor((visible.left - rect.left) / scale_x)
+    top = math.floor((visible.top - rect.top) / scale_y)
+    right = min(width, math.ceil((visible.right - rect.left) / scale_x))
+    bottom = min(height, math.ceil((visible.bottom - rect.top) / scale_y))
+    source = surface.subsurface((left, top, right - left, bottom - top))
+    pygame.transform.smoothscale(source, visible.size, out.subsurface(visible))
+    return out
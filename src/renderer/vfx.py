@@ -1,50 +1,36 @@
 from __future__ import annotations
 
-import random
-from dataclasses import dataclass
+import numpy as np
 import pygame
 
 from .. import config
-
-
-@dataclass
-class ConfettiParticle:
-    x: float
-    y: float
-    vx: float
-    vy: float
-    color: tuple[int, int, int]
-    life: float
-
-
-def spawn_confetti(count: int, y_pos: float) -> list[ConfettiParticle]:
-    particles = []
-    for _ in range(count):
-        vx = random.uniform(-150, 150)
-        vy = random.uniform(-250, -50)
-        p = ConfettiParticle(
-            random.uniform(0, config.WIDTH),
-            y_pos,
-            vx,
-            vy,
-            random.choice(config.CONFETTI_COLORS),
-            config.CONFETTI_LIFETIME,
-        )
-        particles.append(p)
-    return particles
-
-
-def update_confetti(particles: list[ConfettiParticle], dt: float) -> None:
-    for p in particles[:]:
-        p.vy += config.CONFETTI_GRAVITY * dt
-        p.x += p.vx * dt
-        p.y += p.vy * dt
-        p.life -= dt
-        if p.life <= 0 or p.y > config.HEIGHT + 20:
-            particles.remove(p)
-
-
-def draw_confetti(surface: pygame.Surface, particles: list[ConfettiParticle]) -> None:
-    for p in particles:
-        rect = pygame.Rect(int(p.x), int(p.y), 4, 4)
-        pygame.draw.rect(surface, p.color, rect)
+from .confetti import ConfettiSystem  # noqa: F401  (re-exported)
+
+# Side in pixels of the square drawn for each confetti
+CONFETTI_SIZE = 4
+
+
+def draw_confetti(surface: pygame.Surface, rows: np.ndarray) -> None:
+    """Draw confetti given as ``(x, y, color)`` rows in one pixel write.
+
+    ``color`` is an index into ``config.CONFETTI_COLORS``. Each particle is a
+    ``CONFETTI_SIZE`` square whose top left corner is the truncated position,
+    clipped to the surface.
+    """
+    if not len(rows):
+        return
+    palette = np.asarray(config.CONFETTI_COLORS, dtype=np.uint8)
+    rows = np.asarray(rows)
+    quad = np.arange(CONFETTI_SIZE)
+    px = rows[:, 0].astype(np.int64)[:, None, None] + quad[None, :, None]
+    py = rows[:, 1].astype(np.int64)[:, None, None] + quad[None, None, :]
+    px, py = np.broadcast_arrays(px, py)
+    width, height = surface.get_size()
+    inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    colors = palette[rows[:, 2].astype(np.intp)]
+    colors = np.broadcast_to(colors[:, None, None, :], px.shape + (3,))
+    pixels = pygame.surfarray.pixels3d(surface)
+    try:
+        pixels[px[inside], py[inside]] = colors[inside]
+    finally:
+        del pixels
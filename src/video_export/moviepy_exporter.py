@@ -1,31 +1,36 @@
-"""Video assembly utilities using MoviePy."""
+"""Export of in-memory clips to MP4 files."""
 
-import os
-from tempfile import NamedTemporaryFile
-from typing import List
+from typing import Iterable, Optional
 
 import numpy as np
-try:
-    # MoviePy <2.x provides the ``editor`` module. In later versions the
-    # classes are exposed at the package root, so we fall back gracefully.
-    from moviepy.editor import ImageSequenceClip, AudioFileClip
-except ModuleNotFoundError:  # pragma: no cover - legacy compatibility
-    import moviepy
-    ImageSequenceClip = moviepy.ImageSequenceClip
-    AudioFileClip = moviepy.AudioFileClip
 
 from .. import config
+from .stream_writer import EncoderOptions, StreamWriter
 
 
-def export_video(frames: List[np.ndarray], audio, output_path: str, fps: int = config.FPS) -> None:
-    """Export the given frames and audio segment to an MP4 file."""
-    clip = ImageSequenceClip(frames, fps=fps)
-    with NamedTemporaryFile(delete=False, suffix=".wav") as temp_wav:
-        audio.export(temp_wav.name, format="wav")
-        audio_clip = AudioFileClip(temp_wav.name)
-        try:
-            clip = clip.set_audio(audio_clip)
-        except AttributeError:  # MoviePy >=2.1 uses ``with_audio``
-            clip = clip.with_audio(audio_clip)  # pragma: no cover
-        clip.write_videofile(output_path, codec="libx264", audio_codec="aac")
-    os.unlink(temp_wav.name)
+def export_video(
+    frames: Iterable[np.ndarray],
+    audio,
+    output_path: str,
+    fps: int = config.FPS,
+    encoder: Optional[EncoderOptions] = None,
+) -> None:
+    """Export the given frames and audio to an MP4 file.
+
+    ``audio`` is a Pydub ``AudioSegment`` or int16 PCM as accepted by
+    :func:`~.stream_writer.pcm_input`. Frames and samples are piped to a
+    single ffmpeg process, without temporary files; ``encoder`` overrides
+    the encoding settings from ``config``.
+    """
+    frames = iter(frames)
+    first = next(frames)
+    height, width = first.shape[:2]
+    writer = StreamWriter(output_path, size=(width, height), fps=fps, audio=audio, encoder=encoder)
+    try:
+        writer.write(first)
+        for frame in frames:
+            writer.write(frame)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
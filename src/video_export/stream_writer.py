@@ -0,0 +1,243 @@
+"""Streaming video export piping raw RGB frames into an ffmpeg subprocess."""
+
+import os
+import queue
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from tempfile import NamedTemporaryFile
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .. import config
+
+# ffmpeg sample formats of little-endian PCM, by sample width in bytes
+_PCM_FORMATS = {1: "u8", 2: "s16le", 4: "s32le"}
+
+
+def ffmpeg_executable() -> str:
+    """Return the ffmpeg binary to use, preferring the one bundled with MoviePy."""
+    try:
+        import imageio_ffmpeg
+
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except (ImportError, RuntimeError):  # pragma: no cover - depends on install
+        return "ffmpeg"
+
+
+@dataclass(frozen=True)
+class EncoderOptions:
+    """ffmpeg encoder settings, defaulting to the values in ``config``."""
+
+    codec: str = field(default_factory=lambda: config.VIDEO_CODEC)
+    preset: str = field(default_factory=lambda: config.X264_PRESET)
+    crf: int = field(default_factory=lambda: config.X264_CRF)
+    threads: int = field(default_factory=lambda: config.ENCODER_THREADS)
+    audio_codec: str = field(default_factory=lambda: config.AUDIO_CODEC)
+    audio_bitrate: Optional[str] = field(default_factory=lambda: config.AUDIO_BITRATE)
+
+    def video_args(self) -> List[str]:
+        """Return the ffmpeg output arguments of the video stream."""
+        args = ["-c:v", self.codec, "-preset", self.preset, "-crf", str(self.crf)]
+        if self.threads:
+            args += ["-threads", str(self.threads)]
+        return args + ["-pix_fmt", "yuv420p"]
+
+    def audio_args(self) -> List[str]:
+        """Return the ffmpeg output arguments of the audio stream."""
+        args = ["-c:a", self.audio_codec]
+        if self.audio_bitrate:
+            args += ["-b:a", self.audio_bitrate]
+        return args
+
+
+def pcm_input(audio) -> Tuple[memoryview, List[str]]:
+    """Return the raw samples of ``audio`` and the ffmpeg arguments to read them.
+
+    ``audio`` is either a Pydub ``AudioSegment`` or a ``(samples, channels)``
+    int16 array at ``config.AUDIO_SAMPLE_RATE``.
+    """
+    if isinstance(audio, np.ndarray):
+        data = memoryview(np.ascontiguousarray(audio, dtype=np.int16)).cast("B")
+        rate, channels, width = config.AUDIO_SAMPLE_RATE, audio.shape[1], 2
+    else:
+        data = memoryview(audio.raw_data)
+        rate, channels, width = audio.frame_rate, audio.channels, audio.sample_width
+    args = ["-f", _PCM_FORMATS[width], "-ar", str(rate), "-ac", str(channels)]
+    return data, args
+
+
+def _write_pipe(fd: int, data: memoryview) -> None:
+    """Write ``data`` to pipe ``fd`` and close it, ignoring a reader that quit early."""
+    with open(fd, "wb") as pipe:
+        try:
+            pipe.write(data)
+        except (BrokenPipeError, OSError):
+            pass
+
+
+class StreamWriter:
+    """Encode frames as they are produced instead of buffering the whole clip.
+
+    Frames pushed with :meth:`write` go through a bounded queue to a background
+    thread feeding ffmpeg's stdin, so peak memory is ``queue_size`` frames no
+    matter how long the clip is.
+
+    When ``audio`` is known up front it is fed to ffmpeg through a second pipe
+    while the frames are encoded, and the clip is written straight to
+    ``output_path``, the audio padded with silence or cut to the video length.
+    Otherwise the video stream is encoded to a temporary file next to
+    ``output_path`` and :meth:`close` muxes in the audio track, piped to
+    ffmpeg's stdin. ``audio`` is anything :func:`pcm_input` accepts.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        size: Tuple[int, int] = (config.WIDTH, config.HEIGHT),
+        fps: int = config.FPS,
+        queue_size: int = config.STREAM_QUEUE_SIZE,
+        audio=None,
+        encoder: Optional[EncoderOptions] = None,
+    ) -> None:
+        self.output_path = output_path
+        self.size = size
+        self.fps = fps
+        self.frame_count = 0
+        self.encoder = encoder or EncoderOptions()
+        self._audio_thread: Optional[threading.Thread] = None
+        width, height = size
+        cmd = [
+            ffmpeg_executable(),
+            "-y",
+            "-loglevel", "error",
+            "-f", "rawvideo",
+            "-pix_fmt", "rgb24",
+            "-s", f"{width}x{height}",
+            "-r", str(fps),
+            "-i", "-",
+        ]
+        if audio is None:
+            out_dir = os.path.dirname(os.path.abspath(output_path))
+            with NamedTemporaryFile(delete=False, suffix=".mp4", dir=out_dir) as tmp:
+                self._video_path = tmp.name
+            cmd += ["-an", *self.encoder.video_args(), self._video_path]
+            self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        else:
+            self._video_path = output_path
+            data, audio_input = pcm_input(audio)
+            read_fd, write_fd = os.pipe()
+            cmd += [
+                *audio_input,
+                "-i", f"pipe:{read_fd}",
+                *self.encoder.video_args(),
+                *self.encoder.audio_args(),
+                "-af", "apad",
+                "-shortest",
+                output_path,
+            ]
+            try:
+                self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, pass_fds=(read_fd,))
+            except BaseException:
+                os.close(write_fd)
+                raise
+            finally:
+                os.close(read_fd)
+            self._audio_thread = threading.Thread(
+                target=_write_pipe, args=(write_fd, data), daemon=True
+            )
+            self._audio_thread.start()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._feed, daemon=True)
+        self._thread.start()
+
+    def _feed(self) -> None:
+        """Drain the frame queue into the encoder until the sentinel arrives."""
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            if self._error is not None:
+                continue
+            try:
+                self._proc.stdin.write(memoryview(np.ascontiguousarray(frame)))
+            except (BrokenPipeError, OSError) as exc:
+                self._error = exc
+
+    def write(self, frame: np.ndarray) -> None:
+        """Queue an ``(height, width, 3)`` uint8 frame for encoding.
+
+        Blocks while the queue is full so a fast producer cannot outrun the
+        encoder. The array must not be modified after being handed over, until
+        ``queue_size + 1`` more frames have been written; frames from a ring
+        of ``config.FRAME_RING_SLOTS`` slots are safe to reuse.
+        """
+        if self._error is not None:
+            raise RuntimeError("ffmpeg stopped accepting frames") from self._error
+        width, height = self.size
+        if frame.shape != (height, width, 3):
+            raise ValueError(f"Expected frame of shape {(height, width, 3)}, got {frame.shape}")
+        self._queue.put(frame)
+        self.frame_count += 1
+
+    def _finish_video(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        self._proc.stdin.close()
+        code = self._proc.wait()
+        if self._audio_thread is not None:
+            self._audio_thread.join()
+        if self._error is not None or code != 0:
+            raise RuntimeError(f"ffmpeg video encoding failed (exit code {code})") from self._error
+
+    def close(self, audio=None) -> None:
+        """Finish encoding and write ``output_path``, muxing ``audio`` if given.
+
+        ``audio`` is trimmed to the video length. It cannot be given here when
+        it was already passed to the constructor.
+        """
+        if self._audio_thread is not None:
+            if audio is not None:
+                raise ValueError("audio was already given to the constructor")
+            try:
+                self._finish_video()
+            except BaseException:
+                if os.path.exists(self.output_path):
+                    os.unlink(self.output_path)
+                raise
+            return
+        try:
+            self._finish_video()
+            if audio is None:
+                os.replace(self._video_path, self.output_path)
+                return
+            data, audio_input = pcm_input(audio)
+            cmd = [
+                ffmpeg_executable(),
+                "-y",
+                "-loglevel", "error",
+                "-i", self._video_path,
+                *audio_input,
+                "-i", "-",
+                "-t", f"{self.frame_count / self.fps:.6f}",
+                "-c:v", "copy",
+                *self.encoder.audio_args(),
+                self.output_path,
+            ]
+            subprocess.run(cmd, input=data, check=True)
+        finally:
+            if os.path.exists(self._video_path):
+                os.unlink(self._video_path)
+
+    def abort(self) -> None:
+        """Stop the encoder and discard the partial output."""
+        self._proc.kill()
+        self._queue.put(None)
+        self._thread.join()
+        self._proc.wait()
+        if self._audio_thread is not None:
+            self._audio_thread.join()
+        if os.path.exists(self._video_path):
+            os.unlink(self._video_path)
@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.batch import batch_generate
+
+
+def test_build_jobs_derives_one_seed_per_clip():
+    jobs = batch_generate.build_jobs(3, seed=10, perfect_stack=None, sky="skyline_day.png")
+    assert [job.index for job in jobs] == [0, 1, 2]
+    assert [job.seed for job in jobs] == [10, 11, 12]
+    assert all(job.sky == "skyline_day.png" for job in jobs)
+    assert all(job.perfect_stack is False for job in jobs)
+
+
+def test_build_jobs_without_seed():
+    jobs = batch_generate.build_jobs(2)
+    assert [job.seed for job in jobs] == [None, None]
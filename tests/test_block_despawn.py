@@ -7,6 +7,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from src.physics_sim import space_builder, block
 from src import config
+from src.batch import simulate
 
 
 def simulate_step(space, steps):
@@ -163,3 +164,35 @@ def test_despawn_can_be_disabled():
         assert second in remaining
     finally:
         config.BLOCK_DESPAWN_ENABLED = original
+
+
+def test_sleeping_blocks_are_checked_again_only_when_their_contacts_change(monkeypatch):
+    import random
+
+    from src.batch import stress
+    from src.physics_sim.impacts import ImpactMonitor
+
+    space, blocks, contacts = stress.build_scenario("tower", 8, profile="production")
+    impacts = ImpactMonitor(space)
+    rng = random.Random(0)
+    for _ in range(2 * config.FPS):
+        simulate.step_frame(space, blocks, contacts, impacts, rng)
+    bodies = [blocks.bodies[block_id] for block_id in blocks.ids()]
+    assert all(body.is_sleeping for body in bodies)
+
+    checked = []
+    is_kept = simulate._is_kept
+
+    def counting_is_kept(body, graph):
+        checked.append(body)
+        return is_kept(body, graph)
+
+    monkeypatch.setattr(simulate, "_is_kept", counting_is_kept)
+    simulate.step_frame(space, blocks, contacts, impacts, rng)
+    assert checked == []
+
+    top = max(bodies, key=lambda body: body.position.y)
+    below = next(iter(contacts.neighbors(top)))
+    contacts.discard(top)
+    simulate.step_frame(space, blocks, contacts, impacts, rng)
+    assert set(checked) == {top, below}
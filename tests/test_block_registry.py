@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import config
+from src.physics_sim import block, space_builder
+
+
+def test_registry_ids_timers_and_removal():
+    space = space_builder.init_space()
+    blocks = block.BlockRegistry(capacity=2)
+    bodies = [
+        block.create_block(space, 100 + 200 * i, 300, config.BLOCK_VARIANTS[i % 2], registry=blocks)
+        for i in range(3)
+    ]
+    assert [b.block_id for b in bodies] == [0, 1, 2]
+    np.testing.assert_array_equal(blocks.variant[blocks.ids()], [0, 1, 0])
+
+    blocks.flash[[0, 2]] = [0.05, 0.5]
+    blocks.tick(0.1)
+    np.testing.assert_allclose(blocks.flash[blocks.ids()], [0.0, 0.0, 0.4])
+
+    blocks.flags[1] |= blocks.FALLING
+    np.testing.assert_array_equal(blocks.with_flag(blocks.FALLING), [1])
+    blocks.remove(1)
+    np.testing.assert_array_equal(blocks.ids(), [0, 2])
+    assert len(blocks.with_flag(blocks.FALLING)) == 0
+    assert block.create_block(space, 800, 300, registry=blocks).block_id == 3
@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import config
+from src.batch import cache
+
+
+def test_clip_key_depends_on_options_and_config(monkeypatch):
+    key = cache.clip_key(7, "skyline_day.png", False, with_audio=True)
+    assert key == cache.clip_key(7, "skyline_day.png", False, with_audio=True)
+    assert key != cache.clip_key(8, "skyline_day.png", False, with_audio=True)
+    assert key != cache.clip_key(7, "skyline_day.png", False, with_audio=False)
+    assert cache.clip_key(None, "skyline_day.png", False, with_audio=True) is None
+    monkeypatch.setattr(config, "TIME_LIMIT", config.TIME_LIMIT + 1)
+    assert key != cache.clip_key(7, "skyline_day.png", False, with_audio=True)
+    monkeypatch.setattr(config, "STREAM_QUEUE_SIZE", config.STREAM_QUEUE_SIZE + 1)
+    monkeypatch.setattr(config, "TIME_LIMIT", config.TIME_LIMIT - 1)
+    assert key == cache.clip_key(7, "skyline_day.png", False, with_audio=True)
+
+
+def test_store_then_restore(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "OUTPUT_CACHE_DIR", str(tmp_path / "cache"))
+    clip = tmp_path / "run_0.mp4"
+    clip.write_bytes(b"video")
+    key = cache.clip_key(1, None, None, with_audio=False)
+    restored = tmp_path / "run_1.mp4"
+    assert not cache.restore(key, str(restored))
+    cache.store(key, str(clip))
+    assert cache.restore(key, str(restored))
+    assert restored.read_bytes() == b"video"
+    assert [p.name for p in (tmp_path / "cache").iterdir()] == [f"{key}.mp4"]
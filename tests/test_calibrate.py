@@ -0,0 +1,65 @@
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from src import config
+from src.batch import calibrate
+
+
+def test_grid_estimates_and_overlay():
+    param_sets = calibrate.grid({"TIME_LIMIT": [8, 14], "BLOCK_DROP_INTERVAL": [2]})
+    assert param_sets == [
+        {"TIME_LIMIT": 8, "BLOCK_DROP_INTERVAL": 2},
+        {"TIME_LIMIT": 14, "BLOCK_DROP_INTERVAL": 2},
+    ]
+    short, long = calibrate.evaluate(param_sets, range(3), chunk_size=2, perfect_stack=True)
+    assert config.TIME_LIMIT == 10
+    assert (short.runs, short.win_rate) == (3, 0.0)
+    assert (long.runs, long.win_rate) == (3, 1.0)
+    assert all(0 < t <= 14 for t in long.win_times)
+
+    text = calibrate.overlay(calibrate.closest([short, long], 0.9), 0.9)
+    assert "TIME_LIMIT = 14\nBLOCK_DROP_INTERVAL = 2\n" in text
+
+
+def test_parse_value_reads_ranges():
+    assert calibrate.parse_value("12") == 12
+    assert calibrate.parse_value("0.4:0.8") == (0.4, 0.8)
+    assert calibrate.parse_value("-12:12") == (-12, 12)
+
+
+def test_parameters_are_checked_before_running():
+    assert calibrate.checked_value("BLOCK_DROP_INTERVAL", 1.5) == 1.5
+    assert calibrate.checked_value("DROP_VARIATION_RANGE", (-8, 8)) == (-8, 8)
+    for name, value in (
+        ("TIME_LIMIT", 40.5),
+        ("DROP_VARIATION_RANGE", (-8.5, 8.5)),
+        ("CRANE_OSC_FREQUENCY_RANGE", 0.5),
+        ("TIME_LIMIT", (8, 12)),
+        ("NO_SUCH_SETTING", 1),
+    ):
+        with pytest.raises(ValueError):
+            calibrate.checked_value(name, value)
+    with pytest.raises(ValueError):
+        calibrate.bisect("CRANE_OSC_AMPLITUDE_RANGE", 1, 2, 0.5, range(1))
+
+
+def test_cli_rejects_bad_parameters():
+    root = Path(__file__).resolve().parents[1]
+    for args in (
+        ["--bisect", "DROP_VARIATION_RANGE", "--low", "1", "--high", "2"],
+        ["--bisect", "NO_SUCH_SETTING", "--low", "1", "--high", "2"],
+        ["--grid", "TIME_LIMIT=40.5"],
+    ):
+        result = subprocess.run(
+            [sys.executable, "-m", "src.batch.calibrate", "--target", "0.5", *args],
+            cwd=root,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 2
+        assert "error:" in result.stderr
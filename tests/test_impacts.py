@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import config
+from src.physics_sim import block, space_builder
+from src.physics_sim.impacts import ImpactMonitor
+from src.physics_sim.tower_graph import TowerGraph
+
+
+def _drop(space, monitor, frames):
+    found = []
+    for _ in range(frames):
+        space.step(1 / config.FPS)
+        found.extend(monitor.collect())
+    return found
+
+
+def test_impact_reported_once_per_first_contact():
+    space = space_builder.init_space()
+    monitor = ImpactMonitor(space)
+    body = block.create_block(space, 500, 400)
+
+    impacts = _drop(space, monitor, 2 * config.FPS)
+
+    assert len(impacts) == 1
+    (a, b), strength = impacts[0]
+    assert a.body is body and b.collision_type == space_builder.FLOOR_COLLISION_TYPE
+    assert strength > 0
+
+
+def test_block_on_block_impacts_and_global_handlers_still_run():
+    space = space_builder.init_space()
+    monitor = ImpactMonitor(space)
+    graph = TowerGraph(space)
+    height = config.BLOCK_SIZE[1]
+    bottom = block.create_block(space, 500, config.FLOOR_Y + 5 + height / 2)
+    _drop(space, monitor, config.FPS)
+    top = block.create_block(space, 500, 700)
+
+    impacts = _drop(space, monitor, config.FPS)
+
+    assert [{s.body for s in shapes} for shapes, _ in impacts] == [{bottom, top}]
+    assert graph.has_block_on_top(bottom)
+
+
+def test_sensor_contacts_are_ignored():
+    space = space_builder.init_space()
+    monitor = ImpactMonitor(space)
+    body = block.create_block(space, 500, 400)
+    for shape in body.shapes:
+        shape.sensor = True
+
+    assert _drop(space, monitor, config.FPS) == []
@@ -0,0 +1,62 @@
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import config
+from src.batch import simulate
+
+
+def test_outcome_matches_recorded_trace(monkeypatch):
+    monkeypatch.setattr(config, "TIME_LIMIT", 12)
+    for seed, perfect_stack in ((0, False), (1, False), (2, True)):
+        trace = simulate.simulate(seed, perfect_stack=perfect_stack, fail_sound_duration=3)
+        outcome = simulate.simulate_outcome(seed, perfect_stack=perfect_stack, fail_sound_duration=3)
+        assert (outcome.state, outcome.final_remaining, outcome.sky) == (
+            trace.state,
+            trace.final_remaining,
+            trace.sky,
+        )
+        assert outcome.events == trace.events
+        assert outcome.block_count == int(trace.bodies[:, 0].max()) + 1
+        assert outcome.impact_count == sum(name == "impact" for _, name in trace.events)
+
+
+def test_outcome_sizes_the_fail_screen_like_clips_with_audio(monkeypatch):
+    from src.audio import sound_info
+
+    monkeypatch.setattr(config, "TIME_LIMIT", 1)
+    trace = simulate.simulate(0, fail_sound_duration=sound_info.fail_sound_duration())
+    silent = simulate.simulate(0)
+    outcome = simulate.simulate_outcome(0)
+    assert trace.state == outcome.state == "fail"
+    assert trace.frame_count > silent.frame_count
+    assert outcome.events == trace.events
+
+
+def test_outcome_cli_does_not_load_media_libraries():
+    code = (
+        "import sys; import src.batch.outcome; "
+        "assert not {'pygame', 'pydub', 'moviepy'} & set(sys.modules)"
+    )
+    root = Path(__file__).resolve().parents[1]
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
+
+
+def test_bug_forces_give_the_same_outcome_with_and_without_sleeping(monkeypatch):
+    monkeypatch.setattr(config, "BUG_SIDE_IMPULSE", 20.0)
+    monkeypatch.setattr(config, "BUG_SPIN_VELOCITY", 0.02)
+    outcomes = {}
+    for profile in ("legacy", "production"):
+        monkeypatch.setattr(config, "PHYSICS_PROFILE", profile)
+        outcomes[profile] = simulate.simulate_outcome(1, fail_sound_duration=0)
+    for outcome in outcomes.values():
+        assert (
+            outcome.state,
+            outcome.final_remaining,
+            outcome.block_count,
+            outcome.impact_count,
+            outcome.despawn_count,
+        ) == ("fail", 0.0, 6, 13, 1)
+    assert outcomes["legacy"].events == outcomes["production"].events
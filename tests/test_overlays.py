@@ -0,0 +1,84 @@
+import json
+import math
+import sys
+from pathlib import Path
+import numpy as np
+import pygame
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import config
+from src.renderer import overlays
+
+
+def _draw_timer_unbaked(surface, text, color):
+    """Draw the timer text blit by blit onto ``surface``."""
+    font = pygame.font.Font(None, 120)
+    font.set_bold(True)
+    width = config.TEXT_OUTLINE_WIDTH
+    surface.blit(font.render(text, True, config.PALETTES["default"]["shadow"]), (12, 12))
+    outline = font.render(text, True, config.TEXT_OUTLINE_COLOR)
+    for ox in range(-width, width + 1):
+        for oy in range(-width, width + 1):
+            if (ox or oy) and ox * ox + oy * oy <= width * width:
+                surface.blit(outline, (10 + ox, 10 + oy))
+    surface.blit(font.render(text, True, color), (10, 10))
+
+
+def test_timer_overlay_is_rendered_once(monkeypatch):
+    monkeypatch.setattr(overlays, "_OVERLAY_CACHE", {})
+    background = pygame.Surface((config.WIDTH, config.HEIGHT))
+    background.fill((40, 120, 200))
+    drawn = background.copy()
+    overlays.draw_timer(drawn, 3.2)
+    overlays.draw_timer(background.copy(), 3.9)
+    assert len(overlays._OVERLAY_CACHE) == 1
+
+    expected = background.copy()
+    _draw_timer_unbaked(expected, "4", (255, 0, 0))
+    assert np.array_equal(
+        pygame.surfarray.array3d(drawn), pygame.surfarray.array3d(expected)
+    )
+
+
+def test_cached_timer_overlay_is_faster_than_drawing_it_from_scratch(monkeypatch):
+    import time
+    import timeit
+
+    monkeypatch.setattr(overlays, "_OVERLAY_CACHE", {})
+    surface = pygame.Surface((config.WIDTH, config.HEIGHT))
+    frames = [5 - i / config.FPS for i in range(2 * config.FPS)]
+
+    def cached():
+        for remaining in frames:
+            overlays.draw_timer(surface, remaining)
+
+    def from_scratch():
+        for remaining in frames:
+            _draw_timer_unbaked(surface, str(math.ceil(remaining)), (255, 0, 0))
+
+    # CPU time of interleaved runs, so that other processes skew neither side
+    cached()
+    best_cached = best_scratch = math.inf
+    for _ in range(7):
+        best_cached = min(best_cached, timeit.Timer(cached, timer=time.process_time).timeit(1))
+        best_scratch = min(best_scratch, timeit.Timer(from_scratch, timer=time.process_time).timeit(1))
+    assert best_cached < best_scratch
+
+
+def test_font_paths_are_resolved_once_and_persisted(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "FONT_CACHE_PATH", str(tmp_path / "fonts.json"))
+    monkeypatch.setattr(overlays, "_FONT_PATHS", None)
+    monkeypatch.setattr(overlays, "_FONTS", {})
+    font = overlays.get_font("arial", 40)
+    assert overlays.get_font("arial", 40) is font
+    assert overlays.get_font("arial", 40, bold=False) is not font
+    saved = json.loads((tmp_path / "fonts.json").read_text())
+    assert {"arial", "courier", "neon tubes"} <= saved.keys()
+
+    def no_scan(name):
+        raise AssertionError(f"{name} looked up again")
+
+    monkeypatch.setattr(overlays, "_FONT_PATHS", None)
+    monkeypatch.setattr(pygame.font, "match_font", no_scan)
+    assert overlays.font_path("courier") == saved["courier"]
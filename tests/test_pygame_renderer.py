@@ -6,6 +6,7 @@ import math
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from src import config
 from src.renderer import pygame_renderer
 from src.physics_sim import space_builder
 from src.physics_sim import block
@@ -22,12 +23,81 @@ def test_render_frame_shape(tmp_path):
     block.create_block(space, 540, 100, "block.png")
     surface = pygame.Surface((1080, 1920))
     arr = pygame_renderer.render_frame(
-        surface, space, assets, 540, "skyline_day.png", "block.png"
+        surface, space, assets, 540, "skyline_day.png", "block.png", extract=True
     )
     assert arr.shape[0] == 1920 and arr.shape[1] == 1080
 
 
+def test_grab_frame_fills_ring_slots():
+    surface = pygame.Surface((30, 20))
+    surface.fill((10, 20, 30))
+    surface.set_at((5, 7), (200, 100, 50))
+    ring = pygame_renderer.FrameRing((30, 20), slots=2)
+    first = ring.next()
+    frame = pygame_renderer.grab_frame(surface, first)
+    assert frame is first and frame.flags.c_contiguous
+    np.testing.assert_array_equal(
+        frame, np.transpose(pygame.surfarray.array3d(surface), (1, 0, 2))
+    )
+    assert ring.next() is not first
+    assert np.shares_memory(ring.next(), first)
+
+
 def test_rotate_surface_swaps_dimensions():
     img = pygame.Surface((10, 20))
     rotated = pygame_renderer.rotate_surface(img, math.pi / 2)
     assert rotated.get_size() == (20, 10)
+
+
+def test_static_background_is_built_once():
+    assets = {
+        "sky": {"skyline_day.png": pygame.Surface((1080, 1920))},
+        "crane_bar": pygame.Surface((540, 400)),
+    }
+    assets["crane_bar"].fill((255, 0, 0))
+    background = pygame_renderer.static_background(assets, "skyline_day.png")
+    assert pygame_renderer.static_background(assets, "skyline_day.png") is background
+    assert background.get_at((1079, config.CRANE_BAR_Y + 399))[:3] == (255, 0, 0)
+
+
+def test_rotation_cache_quantizes_angles():
+    cache = pygame_renderer.RotationCache(step_deg=0.25, max_bytes=10**9)
+    img = pygame.Surface((10, 20))
+    assert cache.get("block.png", img, 0.001) is img
+    first = cache.get("block.png", img, math.radians(10))
+    assert cache.get("block.png", img, math.radians(10.1)) is first
+    assert first.get_size() != img.get_size()
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["unrotated"]) == (1, 1, 1)
+    assert stats["entries"] == 1
+
+
+def test_rotation_cache_evicts_least_recently_used():
+    img = pygame.Surface((10, 20))
+    cache = pygame_renderer.RotationCache(step_deg=1, max_bytes=1)
+    first = cache.get("block.png", img, math.radians(30))
+    cache.get("block.png", img, math.radians(60))
+    assert cache.stats()["entries"] == 1
+    assert cache.get("block.png", img, math.radians(30)) is not first
+
+
+def test_apply_camera_reuses_the_view_surface():
+    surface = pygame.Surface((40, 60))
+    pixels = np.zeros((40, 60, 3), dtype=np.uint8)
+    pixels[..., 0] = np.arange(40)[:, None] * 6
+    pixels[..., 1] = np.arange(60)[None, :] * 4
+    pygame.surfarray.blit_array(surface, pixels)
+    view = pygame.Surface((40, 60))
+
+    assert pygame_renderer.apply_camera(surface, (0.0, 0.0), 1.0, view) is surface
+
+    shaken = pygame.surfarray.array3d(pygame_renderer.apply_camera(surface, (3.0, -2.0), 1.0, view))
+    np.testing.assert_array_equal(shaken[3:, :58], pixels[:37, 2:])
+    assert not shaken[:3].any() and not shaken[:, 58:].any()
+
+    zoomed = pygame_renderer.apply_camera(surface, (0.0, 0.0), 1.5, view)
+    assert zoomed is view
+    expected = pygame.Surface((40, 60))
+    expected.blit(pygame.transform.smoothscale(surface, (60, 90)), (-10, -15))
+    diff = pygame.surfarray.array3d(zoomed).astype(int) - pygame.surfarray.array3d(expected)
+    assert np.abs(diff).max() <= 6
@@ -0,0 +1,61 @@
+import sys
+from itertools import islice
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import config
+from src.batch import cache, render, simulate
+from src.renderer import overlays, pygame_renderer
+
+
+def test_parallel_replay_matches_sequential(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "OUTPUT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "INTRO_CACHE_DIR", str(tmp_path / "intro"))
+    monkeypatch.setattr(config, "FONT_CACHE_PATH", str(tmp_path / "fonts.json"))
+    monkeypatch.setattr(config, "TIME_LIMIT", 1)
+    recorded = simulate.simulate(seed=2, sky="skyline_day.png")
+    count = recorded.intro_frames + 4
+    size = (108, 192)
+    sequential = render.replay_frames(recorded, pygame_renderer.load_assets(), size=size)
+    parallel = render.replay_frames_parallel(recorded, 2, size=size, slots=3)
+    try:
+        for expected, frame in zip(islice(sequential, count), islice(parallel, count)):
+            assert frame.shape == (192, 108, 3)
+            np.testing.assert_array_equal(frame, expected)
+    finally:
+        parallel.close()
+
+
+def test_intro_frame_is_rendered_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "INTRO_CACHE_DIR", str(tmp_path / "intro"))
+    monkeypatch.setattr(config, "FONT_CACHE_PATH", str(tmp_path / "fonts.json"))
+    monkeypatch.setattr(overlays, "_FONT_PATHS", None)
+    monkeypatch.setattr(render, "_INTRO_FRAMES", {})
+    recorded = simulate.simulate(seed=4, perfect_stack=True, sky="skyline_night.png")
+    assets = pygame_renderer.load_assets()
+    size = (108, 192)
+    first = render.intro_frame(recorded, assets, "skyline_night.png", size)
+    assert render.intro_frame(recorded, assets, "skyline_night.png", size) is first
+    assert len(list((tmp_path / "intro").iterdir())) == 1
+
+    monkeypatch.setattr(render, "_INTRO_FRAMES", {})
+    reloaded = render.intro_frame(recorded, None, "skyline_night.png", size)
+    np.testing.assert_array_equal(reloaded, first)
+
+
+def test_intro_cache_misses_after_a_version_bump(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "INTRO_CACHE_DIR", str(tmp_path / "intro"))
+    monkeypatch.setattr(config, "FONT_CACHE_PATH", str(tmp_path / "fonts.json"))
+    monkeypatch.setattr(overlays, "_FONT_PATHS", None)
+    monkeypatch.setattr(render, "_INTRO_FRAMES", {})
+    recorded = simulate.simulate(seed=4, perfect_stack=True, sky="skyline_night.png")
+    assets = pygame_renderer.load_assets()
+    size = (108, 192)
+    render.intro_frame(recorded, assets, "skyline_night.png", size)
+
+    monkeypatch.setattr(cache, "CACHE_VERSION", cache.CACHE_VERSION + 1)
+    monkeypatch.setattr(render, "_INTRO_FRAMES", {})
+    render.intro_frame(recorded, assets, "skyline_night.png", size)
+    assert len(list((tmp_path / "intro").iterdir())) == 2
@@ -0,0 +1,52 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from src.batch import outcome as outcome_mod, seed_search, simulate
+from src.batch.seed_search import Where
+
+
+def test_predicates_compose_over_outcome_and_events():
+    outcome = simulate.simulate_outcome(2, perfect_stack=True)
+    won = seed_search.parse_condition("state=victory")
+    assert won == Where("state", "=", "victory")
+    assert won(outcome) and not (~won)(outcome)
+    impacts = seed_search.parse_condition("events.impact>=1")
+    assert (won & impacts)(outcome) == (outcome.impact_count >= 1)
+    assert (Where("block_count", "<", 0) | won)(outcome)
+    with pytest.raises(TypeError):
+        seed_search.Predicate()
+
+
+def test_bool_conditions_match_and_mistyped_ones_are_rejected():
+    outcome = simulate.simulate_outcome(2, perfect_stack=True)
+    stacked = seed_search.parse_condition("perfect_stack=True")
+    assert stacked == Where("perfect_stack", "=", True)
+    assert stacked(outcome)
+    assert not seed_search.parse_condition("perfect_stack=false")(outcome)
+    for field, value in (("perfect_stack", "True"), ("block_count", "few"), ("state", 1.0)):
+        with pytest.raises(ValueError):
+            Where(field, "==", value)
+
+
+def test_search_stops_after_limit_and_streams_json(tmp_path):
+    predicate = Where("state", "==", "fail")
+    expected = [
+        seed for seed in range(6) if simulate.simulate_outcome(seed).state == "fail"
+    ][:2]
+    found = seed_search.search(predicate, start=0, count=6, limit=2, chunk_size=4)
+    output = tmp_path / "matches.jsonl"
+    assert outcome_mod.write_outcomes(found, str(output)) == 2
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [line["seed"] for line in lines] == expected
+
+
+def test_parallel_search_finds_the_same_seeds():
+    predicate = Where("despawn_count", "==", 0) | Where("events.impact", ">", 3)
+    sequential = {o.seed for o in seed_search.search(predicate, start=0, count=6)}
+    parallel = {o.seed for o in seed_search.search(predicate, start=0, count=6, workers=2, chunk_size=2)}
+    assert parallel == sequential
@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+import random
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import config
+from src.audio import sound_manager
+
+
+def test_mix_adds_events_and_clips_once():
+    rate = config.AUDIO_SAMPLE_RATE
+    loud = np.full((rate // 10, config.AUDIO_CHANNELS), 20000, dtype=np.int16)
+    quiet = np.full((rate // 10, config.AUDIO_CHANNELS), -25000, dtype=np.int16)
+    sounds = {"crash": loud, "timer": quiet}
+    events = [(0.5, "crash"), (0.5, "crash"), (0.55, "timer"), (0.95, "timer")]
+    track = sound_manager.mix_tracks(1.0, events, sounds, rng=random.Random(0))
+
+    assert track.frame_rate == rate and track.channels == config.AUDIO_CHANNELS
+    pcm = np.frombuffer(track.raw_data, dtype=np.int16).reshape(-1, config.AUDIO_CHANNELS)
+    assert len(pcm) == rate
+    start, overlap = rate // 2, rate * 55 // 100
+    assert not pcm[:start].any()
+    # Both crashes saturate, and the sum with the timer is clipped only once
+    assert (pcm[start:overlap] == 32767).all()
+    assert (pcm[overlap : start + rate // 10] == 15000).all()
+    # The last timer is cut at the end of the track
+    assert (pcm[rate * 95 // 100 :] == -25000).all()
+
+
+def test_load_sounds_uses_the_common_format(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SOUND_BANK_PATH", str(tmp_path / "sounds.pcm"))
+    sounds = sound_manager.load_sounds()
+    assert sounds
+    for pcm in sounds.values():
+        assert pcm.dtype == np.int16 and pcm.shape[1] == config.AUDIO_CHANNELS
+
+
+def test_sound_bank_is_built_once_and_mapped(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SOUND_BANK_PATH", str(tmp_path / "sounds.pcm"))
+    monkeypatch.setattr(config, "OUTPUT_CACHE_ENABLED", False)
+    decoded = sound_manager.load_sounds()
+    monkeypatch.setattr(config, "OUTPUT_CACHE_ENABLED", True)
+
+    built = sound_manager.load_sounds()
+    assert (tmp_path / "sounds.json").exists()
+    monkeypatch.setattr(sound_manager, "build_sound_bank", None)
+    mapped = sound_manager.load_sounds()
+
+    assert list(mapped) == list(built) == list(decoded)
+    for name, pcm in mapped.items():
+        assert isinstance(pcm, np.memmap) and not pcm.flags.writeable
+        np.testing.assert_array_equal(pcm, decoded[name])
+
+
+def test_fail_sound_duration_matches_the_decoded_sound(tmp_path, monkeypatch):
+    from src.audio import sound_info
+
+    monkeypatch.setattr(config, "SOUND_BANK_PATH", str(tmp_path / "sounds.pcm"))
+    pcm = sound_manager.load_sounds()["fail_crowd"]
+    assert abs(sound_info.fail_sound_duration() - len(pcm) / config.AUDIO_SAMPLE_RATE) < 1e-3
+    assert sound_info.sound_duration("missing") is None
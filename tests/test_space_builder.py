@@ -1,9 +1,15 @@
+import math
+import random
 import sys
 from pathlib import Path
 
+import pytest
+
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from src.physics_sim import space_builder
+from src import config
+from src.batch import physics_benchmark
+from src.physics_sim import block, space_builder
 
 
 def test_space_has_gravity():
@@ -12,19 +18,59 @@ def test_space_has_gravity():
 
 
 def test_apply_adhesion_forces():
-    import src.config as config
     original = config.BLOCK_ADHESION_FORCE
     config.BLOCK_ADHESION_FORCE = 100.0
     try:
-        space = space_builder.init_space()
-        from src.physics_sim import block
+        space = space_builder.init_space("production")
         y_offset = config.BLOCK_SIZE[1]
         b1 = block.create_block(space, 100, 100)
         b2 = block.create_block(space, 100, 100 + y_offset)
         b1.force = (0, 0)
         b2.force = (0, 0)
+        # With sleeping, idle blocks are left alone so that they can fall asleep
+        space_builder.apply_adhesion_forces(space)
+        assert b1.force.y == 0 and b2.force.y == 0
+        b1.velocity = b2.velocity = (0, -100)
         space_builder.apply_adhesion_forces(space)
         assert b1.force.y > 0
         assert b2.force.y < 0
     finally:
         config.BLOCK_ADHESION_FORCE = original
+
+
+def test_physics_profiles_configure_the_space():
+    space = space_builder.init_space("high-fidelity")
+    assert space.iterations == config.PHYSICS_PROFILES["high-fidelity"]["iterations"]
+    assert math.isinf(space.sleep_time_threshold)
+    with pytest.raises(ValueError):
+        space_builder.init_space("unknown")
+
+
+def test_settled_tower_sleeps_despite_adhesion():
+    _, sleeping = physics_benchmark.settled_frame_time("production", blocks=4, frames=1)
+    assert sleeping == 4
+    _, sleeping = physics_benchmark.settled_frame_time("high-fidelity", blocks=4, frames=1)
+    assert sleeping == 0
+
+
+def test_bug_forces_draw_the_same_values_for_sleeping_bodies(monkeypatch):
+    monkeypatch.setattr(config, "BUG_SIDE_IMPULSE", 20.0)
+    monkeypatch.setattr(config, "BUG_SPIN_VELOCITY", 0.02)
+    height = config.BLOCK_SIZE[1]
+    for profile, asleep in (("production", True), ("legacy", False)):
+        space = space_builder.init_space(profile)
+        bodies = [
+            block.create_block(space, config.WIDTH / 2, config.FLOOR_Y + 5 + height / 2 + i * height)
+            for i in range(4)
+        ]
+        for _ in range(2 * config.FPS):
+            space.step(1 / config.FPS)
+        assert all(body.is_sleeping == asleep for body in bodies)
+
+        rng = random.Random(7)
+        space_builder.apply_bug_forces(space, rng)
+        expected = random.Random(7)
+        for _ in range(2 * len(bodies)):
+            expected.random()
+        assert rng.getstate() == expected.getstate()
+        assert all(body.is_sleeping == asleep for body in bodies)
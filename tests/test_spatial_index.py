@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import config
+from src.physics_sim import block, space_builder
+from src.physics_sim.spatial_index import BlockIndex
+
+
+def test_query_only_returns_nearby_blocks():
+    space = space_builder.init_space()
+    height = config.BLOCK_SIZE[1]
+    bottom = block.create_block(space, 200, 120)
+    top = block.create_block(space, 210, 120 + height)
+    far = block.create_block(space, 900, 120)
+    index = BlockIndex([bottom, top, far])
+    bb = index.bb(bottom)
+    assert index.query(bb.left, bb.bottom, bb.right, bb.top + 1) == [bottom, top]
+    assert far not in index.query(bb.left, bb.bottom, bb.right, bb.top)
+
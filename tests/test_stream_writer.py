@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+import numpy as np
+from pydub import AudioSegment
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.video_export import stream_writer
+
+
+def test_stream_writer_muxes_audio(tmp_path):
+    output = tmp_path / "out.mp4"
+    writer = stream_writer.StreamWriter(str(output), size=(64, 32), fps=10, queue_size=2)
+    for value in range(5):
+        writer.write(np.full((32, 64, 3), value * 40, dtype=np.uint8))
+    writer.close(AudioSegment.silent(duration=1000))
+    assert output.exists()
+    assert writer.frame_count == 5
+    assert list(tmp_path.iterdir()) == [output]
+
+
+def test_stream_writer_rejects_wrong_shape(tmp_path):
+    writer = stream_writer.StreamWriter(str(tmp_path / "out.mp4"), size=(64, 32))
+    try:
+        writer.write(np.zeros((64, 32, 3), dtype=np.uint8))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+    finally:
+        writer.abort()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stream_writer_streams_audio_given_up_front(tmp_path):
+    import imageio_ffmpeg
+
+    output = tmp_path / "out.mp4"
+    pcm = np.zeros((48000 * 2, 2), dtype=np.int16)
+    encoder = stream_writer.EncoderOptions(preset="ultrafast", crf=30, audio_bitrate="64k")
+    writer = stream_writer.StreamWriter(
+        str(output), size=(64, 32), fps=10, audio=pcm, encoder=encoder
+    )
+    for value in range(5):
+        writer.write(np.full((32, 64, 3), value * 40, dtype=np.uint8))
+    writer.close()
+    assert list(tmp_path.iterdir()) == [output]
+    frames, seconds = imageio_ffmpeg.count_frames_and_secs(str(output))
+    assert frames == 5 and seconds < 1
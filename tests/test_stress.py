@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from src import config
+from src.batch import stress
+from src.batch.simulate import FRAME_PASSES
+
+
+@pytest.mark.parametrize("kind", stress.SCENARIOS)
+def test_build_scenario_places_every_block(kind):
+    space, blocks, _ = stress.build_scenario(kind, 20)
+    assert len(blocks.ids()) == 20
+    assert len(space.bodies) == 20
+
+
+def test_build_scenario_widens_the_only_floor():
+    space, blocks, _ = stress.build_scenario("tower", 200)
+    floors = list(space.static_body.shapes)
+    assert len(floors) == 1
+    right = max(blocks.bodies[block_id].position.x for block_id in blocks.ids())
+    assert floors[0].b.x > right + config.WIDTH
+
+
+def test_build_scenario_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        stress.build_scenario("heap", 10)
+
+
+def test_tower_blocks_land_with_spatial_hash():
+    space, blocks, contacts = stress.build_scenario("tower", 16, spatial_hash=True)
+    for _ in range(config.FPS):
+        space.step(1 / config.FPS)
+    bodies = [blocks.bodies[block_id] for block_id in blocks.ids()]
+    assert all(contacts.is_supported(body) for body in bodies)
+    assert sum(contacts.touches_floor(body) for body in bodies) == 2
+
+
+def test_measure_times_every_pass():
+    report = stress.measure("collapse", 16, frames=5)
+    assert set(report.pass_ms) == set(FRAME_PASSES)
+    assert report.frame_ms > 0
+
+
+def test_scaling_exponents_flag_quadratic_python_passes():
+    counts = (10, 20, 40)
+    reports = [
+        stress.StressReport(
+            "tower",
+            n,
+            False,
+            {name: (n * n if name in ("step", "support") else n) / 1000 for name in FRAME_PASSES},
+        )
+        for n in counts
+    ]
+    exponents = stress.scaling_exponents(reports)
+    assert exponents["index"] == pytest.approx(1.0)
+    assert exponents["support"] == pytest.approx(2.0)
+    assert stress.super_linear(exponents) == ["support"]
@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import config
+from src.physics_sim import block, space_builder
+from src.physics_sim.tower_graph import TowerGraph
+
+
+def _settled_stack(count):
+    space = space_builder.init_space()
+    graph = TowerGraph(space)
+    height = config.BLOCK_SIZE[1]
+    stack = [
+        block.create_block(space, 300, config.FLOOR_Y + 5 + height / 2 + i * height)
+        for i in range(count)
+    ]
+    for _ in range(config.FPS):
+        space.step(1 / config.FPS)
+    return space, graph, stack
+
+
+def test_stack_contacts():
+    space, graph, (bottom, middle, top) = _settled_stack(3)
+    falling = block.create_block(space, 800, 1500)
+    space.step(1 / config.FPS)
+
+    assert graph.touches_floor(bottom) and not graph.touches_floor(middle)
+    assert graph.has_block_on_top(bottom) and graph.has_block_on_top(middle)
+    assert not graph.has_block_on_top(top)
+    assert all(graph.is_supported(b) for b in (bottom, middle, top))
+    assert not graph.is_supported(falling)
+    assert graph.max_height([bottom, middle, top, falling]) == top.position.y + config.BLOCK_SIZE[1] / 2
+    top_y = next(iter(top.shapes)).bb.top
+    assert graph.connected_tower(top_y, [bottom, middle, top, falling]) == {bottom, middle, top}
+
+
+def test_removed_block_leaves_the_graph():
+    space, graph, (bottom, top) = _settled_stack(2)
+    space.remove(bottom, *bottom.shapes)
+    assert not graph.is_supported(top)
+    assert not list(graph.neighbors(top))
+
+    space, graph, (bottom, top) = _settled_stack(2)
+    graph.discard(top)
+    assert not graph.has_block_on_top(bottom)
+    assert graph.is_supported(bottom)
+
+
+def test_grounded_set_follows_a_collapse():
+    from collections import deque
+
+    from src.batch import stress
+
+    space, _, graph = stress.build_scenario("collapse", 24, profile="high-fidelity")
+    for _ in range(2 * config.FPS):
+        space.step(1 / config.FPS)
+        grounded = {b for b in space.bodies if graph.touches_floor(b)}
+        queue = deque(grounded)
+        while queue:
+            for other in graph.neighbors(queue.popleft()):
+                if other not in grounded:
+                    grounded.add(other)
+                    queue.append(other)
+        assert {b for b in space.bodies if graph.is_supported(b)} == grounded
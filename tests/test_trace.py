@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import config
+from src.batch import simulate, trace
+
+
+def test_simulated_trace_round_trip(tmp_path):
+    recorded = simulate.simulate(seed=3, perfect_stack=True, sky="skyline_day.png")
+    assert recorded.state in ("victory", "fail")
+    assert recorded.intro_frames == config.INTRO_DURATION * config.FPS
+    assert len(recorded.body_offsets) == recorded.frame_count + 1
+    assert recorded.bodies.dtype == np.float32
+    assert recorded.phase[-1] == trace.PHASE_END
+
+    path = tmp_path / "run.npz"
+    trace.save_trace(recorded, str(path))
+    loaded = trace.load_trace(str(path))
+    assert loaded.events == recorded.events
+    assert loaded.state == recorded.state
+    assert loaded.sky == "skyline_day.png"
+    np.testing.assert_array_equal(loaded.bodies, recorded.bodies)
+    np.testing.assert_array_equal(loaded.camera, recorded.camera)
+    last = loaded.frame_count - 1
+    np.testing.assert_array_equal(loaded.frame_bodies(last), recorded.frame_bodies(last))
+
+
+def test_fail_sound_extends_end_screen():
+    original = config.TIME_LIMIT
+    config.TIME_LIMIT = 1
+    try:
+        short = simulate.simulate(seed=1, sky="skyline_day.png")
+        longer = simulate.simulate(seed=1, sky="skyline_day.png", fail_sound_duration=5.0)
+    finally:
+        config.TIME_LIMIT = original
+    assert short.state == longer.state == "fail"
+    end_frames = (longer.phase == trace.PHASE_END).sum()
+    assert end_frames == 6 * config.FPS
+    assert longer.audio_duration > short.audio_duration
+
+
+def test_same_seed_gives_identical_trace():
+    first = simulate.simulate(seed=5, sky="skyline_dusk.png")
+    second = simulate.simulate(seed=5, sky="skyline_dusk.png")
+    assert first.events == second.events
+    np.testing.assert_array_equal(first.bodies, second.bodies)
+    np.testing.assert_array_equal(first.confetti, second.confetti)
@@ -0,0 +1,42 @@
+import random
+import sys
+from pathlib import Path
+import numpy as np
+import pygame
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import config
+from src.renderer import vfx
+
+
+def test_confetti_update_drops_expired_particles():
+    confetti = vfx.ConfettiSystem()
+    confetti.spawn(50, 100, random.Random(1))
+    same = vfx.ConfettiSystem()
+    same.spawn(50, 100, random.Random(1))
+    np.testing.assert_array_equal(confetti.rows(), same.rows())
+
+    confetti.life[:10] = 0.01
+    confetti.update(1 / config.FPS)
+    assert len(confetti) == 40
+    np.testing.assert_array_equal(confetti.color, same.color[10:])
+    confetti.update(config.CONFETTI_LIFETIME)
+    assert len(confetti) == 0
+    assert confetti.rows().shape == (0, 3)
+
+
+def test_draw_confetti_matches_rects():
+    rows = np.array(
+        [(10.7, 20.2, 0), (12.0, 21.0, 3), (-2.5, 5.0, 1), (1078.0, 1919.0, 4)],
+        dtype=np.float32,
+    )
+    drawn = pygame.Surface((config.WIDTH, config.HEIGHT))
+    vfx.draw_confetti(drawn, rows)
+    expected = pygame.Surface((config.WIDTH, config.HEIGHT))
+    for x, y, color in rows:
+        rect = pygame.Rect(int(x), int(y), 4, 4)
+        pygame.draw.rect(expected, config.CONFETTI_COLORS[int(color)], rect)
+    np.testing.assert_array_equal(
+        pygame.surfarray.array3d(drawn), pygame.surfarray.array3d(expected)
+    )